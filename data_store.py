@@ -0,0 +1,193 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from lap_times import to_timedelta
+
+DATA_DIR = "./data"
+STORE_DIR = "./data/store"
+NULL_VALUE = "\\N"
+
+#COLUMN TYPES OF EACH DATASET
+#"category": repeated strings stored as dictionary-encoded columns
+#"integer": ids, positions and counters (nullable, so "\N" becomes <NA>)
+#"float": coordinates, points and speeds
+#"duration": new timedelta column <- source column holding a time string
+SCHEMAS = {
+    "circuits": {
+        "integer": ["circuitId", "alt"],
+        "float": ["lat", "lng"]
+    },
+    "constructors": {
+        "integer": ["constructorId"]
+    },
+    "drivers": {
+        "integer": ["driverId", "number", "age"]
+    },
+    "pit_stops": {
+        "integer": ["raceId", "driverId", "stop", "lap", "milliseconds"],
+        "duration": {
+            "pit_duration": "duration"
+        }
+    },
+    "qualifying": {
+        "integer": ["qualifyId", "raceId", "driverId", "constructorId", "number", "position"],
+        "duration": {
+            "q1_duration": "q1",
+            "q2_duration": "q2",
+            "q3_duration": "q3"
+        }
+    },
+    "races": {
+        "integer": ["raceId", "year", "round", "circuitId"]
+    },
+    "races_circuits": {
+        "integer": ["raceId", "year", "round", "circuitId", "alt"],
+        "float": ["lat", "lng"]
+    },
+    "results": {
+        "category": [
+            "positionText",
+            "name_race",
+            "date",
+            "race_time",
+            "url_race",
+            "driverRef",
+            "code",
+            "forename",
+            "surname",
+            "dob",
+            "driver_nationality",
+            "url_driver",
+            "constructorRef",
+            "constructor_name",
+            "constructor_nationality",
+            "url_constructor",
+            "status",
+            "circuitRef",
+            "circuit_name",
+            "location",
+            "country",
+            "url",
+            "driver_name"
+        ],
+        "integer": [
+            "resultId",
+            "raceId",
+            "driverId",
+            "constructorId",
+            "number_driver",
+            "grid",
+            "position",
+            "positionOrder",
+            "laps",
+            "milliseconds",
+            "fastestLap",
+            "rank",
+            "statusId",
+            "year",
+            "round",
+            "circuitId",
+            "alt"
+        ],
+        "float": ["points", "fastestLapSpeed", "lat", "lng"],
+        "duration": {
+            "fastestLapTime_duration": "fastestLapTime"
+        }
+    },
+    "cube_wins": {
+        "category": ["entity", "dimension", "value"],
+        "integer": ["entity_id", "count"]
+    },
+    "cube_summary": {
+        "category": ["entity"],
+        "integer": ["entity_id", "races", "wins", "podiums", "first_season", "last_season"]
+    },
+    "data_prep1": {
+        "float": [
+            "number_driver",
+            "grid",
+            "position",
+            "laps",
+            "milliseconds",
+            "fastestLap",
+            "rank",
+            "fastestLapTime_milliseconds",
+            "fastestLapSpeed",
+            "statusId",
+            "year",
+            "round",
+            "circuitId"
+        ]
+    }
+}
+
+#Files read when a dataset has not been written to the store yet
+LEGACY_FILES = {
+    "pit_stops": "pit_stops.csv",
+    "qualifying": "qualifying.csv",
+    "races": "races.csv"
+}
+
+def dataset_path(name):
+    return os.path.join(STORE_DIR, f"{name}.parquet")
+
+def legacy_path(name):
+    return os.path.join(DATA_DIR, LEGACY_FILES.get(name, f"{name}.pkl"))
+
+def _read_legacy(name):
+    path = legacy_path(name)
+    if path.endswith(".csv"):
+        return pd.read_csv(path, na_values = NULL_VALUE, keep_default_na = False)
+    return pd.read_pickle(path)
+
+def convert_types(name, data):
+    schema = SCHEMAS.get(name, {})
+    data = data.replace(NULL_VALUE, np.nan)
+    for column in schema.get("integer", []):
+        if column in data.columns:
+            data[column] = pd.to_numeric(data[column], errors = "coerce").round().astype("Int64")
+            data[column] = data[column].astype(
+                "Int32" if data[column].fillna(0).abs().max() < 2 ** 31 else "Int64")
+    for column in schema.get("float", []):
+        if column in data.columns:
+            data[column] = pd.to_numeric(data[column], errors = "coerce").astype("float64")
+    for column, source in schema.get("duration", {}).items():
+        if source in data.columns:
+            data[column] = to_timedelta(data[source])
+    for column in schema.get("category", []):
+        if column in data.columns:
+            data[column] = data[column].astype("category")
+    return data
+
+def write_dataset(name, data):
+    os.makedirs(STORE_DIR, exist_ok = True)
+    convert_types(name, data).to_parquet(
+        dataset_path(name),
+        engine = "pyarrow",
+        compression = "zstd")
+
+def read_dataset(name, columns = None):
+    #Only the requested columns are read from the parquet file
+    if os.path.exists(dataset_path(name)):
+        return pd.read_parquet(
+            dataset_path(name),
+            engine = "pyarrow",
+            columns = None if columns is None else list(columns))
+    #Fallback: pickle produced by the preprocessing notebooks (or raw CSV)
+    data = convert_types(name, _read_legacy(name))
+    return data if columns is None else data[list(columns)]
+
+def convert_pickles(names = None):
+    for name in names or SCHEMAS.keys():
+        path = legacy_path(name)
+        if not os.path.exists(path):
+            print(f"{name}: {path} not found, skipping")
+            continue
+        write_dataset(name, _read_legacy(name))
+        print(f"{name}: {os.path.getsize(path) // 1024} KB {path.rsplit('.', 1)[1]} -> "
+              f"{os.path.getsize(dataset_path(name)) // 1024} KB parquet")
+
+if __name__ == "__main__":
+    #python data_store.py [dataset ...]
+    convert_pickles(sys.argv[1:])
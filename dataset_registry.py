@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+import numpy as np
+from data_store import dataset_path, legacy_path, read_dataset
+
+#Seconds between checks for a rebuilt dataset file on disk
+REFRESH_INTERVAL = 30
+
+def _source_path(name):
+    #Dependencies of derived objects can also be plain files (a path, e.g. an
+    #Ergast CSV read directly by the query engine)
+    if os.sep in name:
+        return name
+    if os.path.exists(dataset_path(name)):
+        return dataset_path(name)
+    return legacy_path(name)
+
+def _source_mtime(name):
+    try:
+        return os.path.getmtime(_source_path(name))
+    except OSError:
+        return None
+
+def _freeze(data):
+    #Frames are shared by every page and session: make their numeric buffers
+    #read-only so an accidental in-place edit raises instead of leaking across
+    #users. Object, string, categorical and nullable columns stay writable:
+    #pandas 1.5 sorts and hashes them through writable memoryviews
+    #(sort_values/groupby/unique on them would fail)
+    for block in data._mgr.blocks:
+        values = block.values
+        if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+            values.flags.writeable = False
+    return data
+
+class DatasetRegistry:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._frames = {}
+        self._derived = {}
+        self._versions = {}
+        self._mtimes = {}
+        self._checked = {}
+        self._hooks = []
+
+    def get(self, name, columns = None):
+        key = (name, None if columns is None else tuple(columns))
+        with self._lock:
+            self._refresh_if_changed(name)
+            if key not in self._frames:
+                self._frames[key] = _freeze(read_dataset(name, columns))
+                self._mtimes.setdefault(name, _source_mtime(name))
+                self._versions.setdefault(name, 0)
+            return self._frames[key]
+
+    def derived(self, key, builder, depends_on):
+        #Objects built from datasets (indexes, aggregates) are cached until
+        #one of the datasets they depend on is reloaded
+        with self._lock:
+            for name in depends_on:
+                self._refresh_if_changed(name)
+                self._mtimes.setdefault(name, _source_mtime(name))
+            versions = tuple(self._versions.get(name, 0) for name in depends_on)
+            cached = self._derived.get(key)
+            if cached is None or cached[0] != versions:
+                cached = (versions, builder())
+                self._derived[key] = cached
+            return cached[1]
+
+    def version(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def reload(self, name = None):
+        with self._lock:
+            names = {key[0] for key in self._frames} if name is None else {name}
+            for key in [key for key in self._frames if key[0] in names]:
+                del self._frames[key]
+            for dataset in names:
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+                self._mtimes.pop(dataset, None)
+            hooks = list(self._hooks)
+        for hook in hooks:
+            for dataset in sorted(names):
+                hook(dataset, self._versions[dataset])
+
+    def on_reload(self, hook):
+        #hook(name, version) is called after a dataset is dropped from memory
+        with self._lock:
+            self._hooks.append(hook)
+
+    def _refresh_if_changed(self, name):
+        now = time.monotonic()
+        if now - self._checked.get(name, 0) < REFRESH_INTERVAL:
+            return
+        self._checked[name] = now
+        if name in self._mtimes and _source_mtime(name) != self._mtimes[name]:
+            self.reload(name)
+
+#One registry per process, shared by every page and user session
+registry = DatasetRegistry()
+
+def get_dataset(name, columns = None):
+    return registry.get(name, columns)
+
+def dataset_version(name):
+    return registry.version(name)
+
+def reload_datasets(name = None):
+    registry.reload(name)
@@ -0,0 +1,40 @@
+import os
+import numpy as np
+
+#Points a telemetry chart sends to the browser or matplotlib, over all its traces
+CHART_POINTS = int(os.getenv("F1_CHART_POINTS", 4000))
+#Lower bound per trace, so charts with many traces keep their shape
+MIN_TRACE_POINTS = 200
+
+def trace_points(traces, points = CHART_POINTS):
+    #Point budget of each of the traces of one chart
+    return max(points // max(traces, 1), MIN_TRACE_POINTS)
+
+def minmax_indices(values, points = CHART_POINTS):
+    #Min/max-per-bucket downsampling: the samples are split into equal buckets
+    #and the minimum and maximum of every column are kept in each of them,
+    #plus the first and last sample. Peaks, troughs and steps survive, which
+    #a plain stride would drop. Returns sorted sample indices
+    values = np.asarray(values, dtype = np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    samples, columns = values.shape
+    if samples <= points:
+        return np.arange(samples)
+    size = -(-samples // max(points // (2 * columns), 1))
+    buckets = -(-samples // size)
+    padded = np.full((buckets * size, columns), np.nan)
+    padded[:samples] = values
+    padded = padded.reshape(buckets, size, columns)
+    missing = np.isnan(padded)
+    lows = np.where(missing, np.inf, padded).argmin(axis = 1)
+    highs = np.where(missing, -np.inf, padded).argmax(axis = 1)
+    offsets = (np.arange(buckets) * size)[:, None]
+    picked = np.concatenate([(lows + offsets).ravel(), (highs + offsets).ravel(), [0, samples - 1]])
+    return np.unique(np.minimum(picked, samples - 1))
+
+def downsample(telemetry, by, points = CHART_POINTS):
+    #{channel: array} with every channel cut to the samples minmax_indices()
+    #keeps for the channels in by
+    indices = minmax_indices(np.column_stack([telemetry[channel] for channel in by]), points)
+    return {channel: np.asarray(values)[indices] for channel, values in telemetry.items()}
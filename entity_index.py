@@ -0,0 +1,85 @@
+from dataset_registry import registry, get_dataset
+
+#Sorted distinct values offered by filter widgets, per dataset
+OPTION_COLUMNS = {
+    "drivers": ["country", "continent"],
+    "races_circuits": ["name_race", "year", "name_circuit", "location", "country", "continent"]
+}
+#(group column, member column) pairs of the joined results frame
+GROUPINGS = [
+    ("country", "circuit_name"),
+    ("constructor_nationality", "constructor_name"),
+    ("driver_nationality", "driver_name")
+]
+
+def _sorted_values(values):
+    return sorted(values.dropna().unique().tolist())
+
+def _group_members(frame, key, value):
+    pairs = frame[[key, value]].dropna().drop_duplicates()
+    return {
+        group: sorted(members.tolist())
+        for group, members in pairs.groupby(key, observed = True)[value]}
+
+class EntityIndex:
+    def __init__(self, results, drivers, races, option_frames):
+        self._values = {
+            (dataset, column): _sorted_values(option_frames[dataset][column])
+            for dataset, columns in OPTION_COLUMNS.items()
+            for column in columns}
+        self._values.update({
+            ("results", column): _sorted_values(results[column])
+            for key, value in GROUPINGS
+            for column in (key, value)})
+        self._members = {
+            (key, value): _group_members(results, key, value)
+            for key, value in GROUPINGS}
+        #Drivers keep the order of the drivers table
+        seasons = results[["year", "driverId"]].dropna().drop_duplicates()
+        drivers = drivers.drop_duplicates(subset = "driverId")
+        self._drivers_by_season = {
+            int(year): drivers[drivers["driverId"].isin(ids)]["name"].tolist()
+            for year, ids in seasons.groupby("year")["driverId"]}
+        self._driver_by_name = {
+            row["name"]: row
+            for row in drivers[["name", "driverId", "code", "surname"]].to_dict("records")}
+        races = races.sort_values(by = ["year", "round"])
+        self._rounds_by_season = {
+            int(year): dict(zip(season["name"], season["round"].astype(int)))
+            for year, season in races.groupby("year")}
+
+    def values(self, dataset, column):
+        #Sorted distinct values of a column, e.g. values("drivers", "country")
+        return self._values[(dataset, column)]
+
+    def members(self, key, value, groups):
+        #e.g. members("country", "circuit_name", ["Italy"]) -> circuits in Italy
+        members = self._members[(key, value)]
+        return sorted({member for group in groups for member in members.get(group, [])})
+
+    def season_drivers(self, season):
+        return self._drivers_by_season.get(season, [])
+
+    def driver(self, name):
+        #{"name", "driverId", "code", "surname"}
+        return self._driver_by_name[name]
+
+    def season_rounds(self, season):
+        #{race name: round}, in calendar order
+        return self._rounds_by_season.get(season, {})
+
+def _build_index():
+    return EntityIndex(
+        get_dataset("results", columns = [
+            "year",
+            "driverId",
+            *[column for grouping in GROUPINGS for column in grouping]]),
+        get_dataset("drivers", columns = ["driverId", "name", "code", "surname"]),
+        get_dataset("races", columns = ["year", "round", "name"]),
+        {dataset: get_dataset(dataset, columns = columns) for dataset, columns in OPTION_COLUMNS.items()})
+
+def load_index():
+    return registry.derived(
+        "entity_index",
+        _build_index,
+        depends_on = ["results", "drivers", "races", *OPTION_COLUMNS])
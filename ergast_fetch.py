@@ -0,0 +1,181 @@
+import os
+import time
+import glob
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import requests
+from fastf1.ergast import Ergast
+from fastf1.ergast.interface import ErgastError
+from fastf1.req import RateLimitExceededError
+from ergast_offline import OfflineErgast, combine_points
+
+#Per-round results, next to the FastF1 cache
+ERGAST_DIR = os.getenv("F1_ERGAST_DIR", "./cache_fastf1/ergast")
+#Rounds fetched at the same time
+ERGAST_WORKERS = int(os.getenv("F1_ERGAST_WORKERS", 4))
+#ergast.com limits: 4 calls/s burst and 200 calls/h
+CALLS_PER_SECOND = 4
+CALLS_PER_HOUR = 200
+#Attempts after the first failed call, waiting BACKOFF * 2**attempt seconds
+RETRIES = 3
+BACKOFF = 1.0
+#Transient failures worth another attempt; FastF1's RateLimitExceededError is not
+RETRYABLE = (requests.exceptions.RequestException, ErgastError)
+#Failures that leave a round out of the season instead of failing the season
+FETCH_ERRORS = RETRYABLE + (RateLimitExceededError,)
+#Seconds a round that failed to fetch is skipped before it is tried again
+FAILURE_TTL = float(os.getenv("F1_ERGAST_FAILURE_TTL", 300))
+ROUND_COLUMNS = ["round", "race", "driverCode", "points"]
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        #rate in tokens per second
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        #Blocks until a token is free
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, tokens = 1):
+        #Takes the tokens if they are free, without waiting
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+class ErgastFetcher:
+    def __init__(self, ergast = None, directory = ERGAST_DIR, workers = ERGAST_WORKERS, offline = None):
+        self.ergast = ergast or Ergast()
+        #Rounds in the bundled CSV dump are never fetched
+        self.offline = offline
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(max_workers = workers)
+        #(season, round): time.monotonic() of its last failed fetch
+        self._failures = {}
+        self._failures_lock = threading.Lock()
+        self._buckets = [
+            TokenBucket(CALLS_PER_SECOND, CALLS_PER_SECOND),
+            TokenBucket(CALLS_PER_HOUR / 3600, CALLS_PER_HOUR)]
+
+    def _call(self, method, **kwargs):
+        for attempt in range(RETRIES + 1):
+            for bucket in self._buckets:
+                bucket.acquire()
+            try:
+                return getattr(self.ergast, method)(**kwargs)
+            except RETRYABLE as error:
+                if attempt == RETRIES:
+                    raise
+                logger.debug("Ergast %s %s failed (%r), retrying", method, kwargs, error)
+                time.sleep(BACKOFF * 2 ** attempt)
+
+    def _path(self, season, round):
+        return os.path.join(self.directory, str(season), f"{round}.parquet")
+
+    def cached_rounds(self, season):
+        files = glob.glob(os.path.join(self.directory, str(season), "*.parquet"))
+        return sorted(int(os.path.basename(file).split(".")[0]) for file in files)
+
+    def race_schedule(self, season):
+        #From the CSV dump when it has the season, else one rate-limited call
+        if self.offline is not None:
+            schedule = self.offline.dump_schedule(season)
+            if not schedule.empty:
+                return schedule
+        return self._call("get_race_schedule", season = season)
+
+    def fetch_round(self, season, round, race):
+        #Race points plus sprint points of one round; None before the race has results
+        results = self._call("get_race_results", season = season, round = round)
+        if not results.content:
+            return None
+        temp = results.content[0].assign(round = round)
+        # If there is a sprint, get the results as well
+        sprint = self._call("get_sprint_results", season = season, round = round)
+        if sprint.content and sprint.description['round'][0] == round:
+            temp = combine_points(temp, sprint.content[0].assign(round = round))
+        temp['race'] = race.removesuffix(' Grand Prix')
+        temp = temp[ROUND_COLUMNS]
+        #Finished rounds do not change: each one is fetched once
+        path = self._path(season, round)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        temp.to_parquet(temporary)
+        os.replace(temporary, path)
+        return temp
+
+    def _failed_recently(self, season, round):
+        with self._failures_lock:
+            failed = self._failures.get((season, round))
+        return failed is not None and time.monotonic() - failed < FAILURE_TTL
+
+    def _try_fetch_round(self, season, round, race):
+        #(results, error): a failed round is remembered, so the next page views
+        #skip it for FAILURE_TTL seconds instead of paying the retries again
+        try:
+            results = self.fetch_round(season, round, race)
+        except FETCH_ERRORS as error:
+            logger.warning("Ergast results of %s round %s failed: %r", season, round, error)
+            with self._failures_lock:
+                self._failures[(season, round)] = time.monotonic()
+            return None, error
+        with self._failures_lock:
+            self._failures.pop((season, round), None)
+        return results, None
+
+    def season_results(self, season, schedule, incremental = True):
+        #(results, failed): results of every round of a season, one row per
+        #driver and round, and {round: race} of the rounds that could not be
+        #fetched. Rounds in the CSV dump or on disk are read back; the others
+        #are fetched concurrently, and a failed round does not hide the rest.
+        #Incremental mode only fetches the rounds missing from the cache, which
+        #includes rounds that failed while later rounds were saved; otherwise
+        #every round is fetched again
+        rounds = dict(zip(schedule['round'], schedule['raceName']))
+        if 'raceDate' in schedule:
+            #Races that have not happened yet have no results to fetch
+            raced = schedule['raceDate'] <= pd.Timestamp.now()
+            rounds = {round: race for (round, race), done in zip(rounds.items(), raced) if done}
+        offline = self.offline.season_points(season) if self.offline else pd.DataFrame(columns = ROUND_COLUMNS)
+        dumped = set(offline['round'])
+        rounds = {round: race for round, race in rounds.items() if round not in dumped}
+        cached = [round for round in self.cached_rounds(season) if round in rounds] if incremental else []
+        missing = [round for round in rounds if round not in set(cached)]
+        failed = [round for round in missing if self._failed_recently(season, round)]
+        missing = [round for round in missing if round not in failed]
+        fetched = self._executor.map(lambda round: self._try_fetch_round(season, round, rounds[round]), missing)
+        results = [offline] if not offline.empty else []
+        results.extend(pd.read_parquet(self._path(season, round)) for round in cached)
+        for round, (result, error) in zip(missing, fetched):
+            if error is not None:
+                failed.append(round)
+            elif result is not None:
+                results.append(result)
+        failed = {round: rounds[round].removesuffix(' Grand Prix') for round in sorted(failed)}
+        if not results:
+            return pd.DataFrame(columns = ROUND_COLUMNS), failed
+        return pd.concat(results, ignore_index = True).sort_values(by = "round", kind = "stable"), failed
+
+#One fetcher per process, so every user session shares the rate limits
+ergast_fetcher = ErgastFetcher(offline = OfflineErgast())
@@ -0,0 +1,36 @@
+import pandas as pd
+from query_engine import load_engine
+
+def combine_points(race, sprint):
+    #Race points plus sprint points per (round, driverCode); drivers without a
+    #sprint result keep their race points
+    if sprint.empty:
+        return race[["round", "driverCode", "points"]]
+    points = pd.merge(
+        race[["round", "driverCode", "points"]],
+        sprint[["round", "driverCode", "points"]],
+        on = ["round", "driverCode"],
+        how = "left")
+    points["points"] = points["points_x"] + points["points_y"].fillna(0)
+    return points.drop(columns = ["points_x", "points_y"])
+
+class OfflineErgast:
+    #Ergast schedules and season results from the CSV dump in data/ (through
+    #the DuckDB query engine); ErgastFetcher only calls the live API for the
+    #seasons and rounds the dump does not have
+    def dump_schedule(self, season):
+        #Empty when the season is not in the dump
+        return load_engine().query("ergast_schedule", season = season)
+
+    def season_points(self, season):
+        #round, race, driverCode, points of every round in the dump, from two
+        #queries instead of two API calls per round
+        engine = load_engine()
+        points = combine_points(
+            engine.query("ergast_race_results", season = season, round = None),
+            engine.query("ergast_sprint_results", season = season, round = None))
+        schedule = engine.query("ergast_schedule", season = season)
+        races = dict(zip(schedule["round"], schedule["raceName"].str.removesuffix(" Grand Prix")))
+        points["race"] = points["round"].map(races)
+        points["round"] = points["round"].astype(int)
+        return points[["round", "race", "driverCode", "points"]]
@@ -0,0 +1,71 @@
+import streamlit as st
+import plotly.express as px
+from session_cache import session_cache
+from fastf1.req import RateLimitExceededError
+from ergast_fetch import RETRYABLE
+from season_points import season_points
+
+def load_f1_session(season, race, event, groups = ("laps",)):
+    #Sessions live in the bounded session_cache, not in st.cache_resource
+    try:
+        return session_cache.load(season, race, event, groups)
+    except ValueError:
+        st.error(f"This Grand Prix does not have the event {event}. Choose another session type")
+        st.stop()
+    except TimeoutError:
+        st.warning("This session is still being loaded for another user. Try again in a moment.")
+        st.stop()
+    except RateLimitExceededError:
+        st.warning("Error - ergast.com: 200 calls/h. Try in another moment.")
+        st.stop()
+
+def pick_fastest_laps(laps):
+    #Laps.pick_fastest() of every driver with one groupby instead of one
+    #pick_driver() scan per driver, ordered by lap time
+    laps = laps.loc[(laps["IsPersonalBest"] == True) & laps["LapTime"].notna()]
+    fastest = laps.loc[laps.groupby("Driver", sort = False)["LapTime"].idxmin()]
+    return fastest.sort_values(by = "LapTime").reset_index(drop = True)
+
+def season_results(season_ftr):
+    #Renders the points heatmap of season_points(); the matrix is built once
+    #per season (see precompute_season_points)
+    try:
+        points = season_points(season_ftr)
+    except RateLimitExceededError:
+        st.warning("Error - ergast.com: 200 calls/h. Try in another moment.")
+        return
+    except RETRYABLE:
+        st.write("No information.")
+        return
+    if points.missing:
+        st.warning(
+            "Could not get the results of "
+            f"{', '.join(points.missing.values())} from ergast.com. Try again in a moment.")
+    if points.matrix.empty:
+        st.write("No information.")
+        return
+    fig = px.imshow(
+        points.matrix,
+        text_auto=True,
+        aspect='auto',  # Automatically adjust the aspect ratio
+        color_continuous_scale=[[0,    'rgb(198, 219, 239)'],  # Blue scale
+                                [0.25, 'rgb(107, 174, 214)'],
+                                [0.5,  'rgb(33,  113, 181)'],
+                                [0.75, 'rgb(8,   81,  156)'],
+                                [1,    'rgb(8,   48,  107)']],
+        labels={'x': 'Race',
+                'y': 'Driver',
+                'color': 'Points'}       # Change hover texts
+    )
+    fig.update_xaxes(title_text='')      # Remove axis titles
+    fig.update_yaxes(title_text='')
+    fig.update_yaxes(tickmode='linear')  # Show all ticks, i.e. driver names
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGrey',
+                     showline=False,
+                     tickson='boundaries')              # Show horizontal grid only
+    fig.update_xaxes(showgrid=False, showline=False)    # And remove vertical grid
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')     # White background
+    fig.update_layout(coloraxis_showscale=False)        # Remove legend
+    fig.update_layout(xaxis=dict(side='top'))           # x-axis on top
+    fig.update_layout(margin=dict(l=0, r=0, b=0, t=0))  # Remove border margins
+    st.plotly_chart(fig)
@@ -0,0 +1,102 @@
+import os
+import pandas as pd
+from data_store import dataset_path
+from dataset_registry import registry, get_dataset
+
+#entity: (id column, name column, columns counted over the entity's wins)
+ENTITIES = {
+    "circuit": (
+        "circuitId",
+        "circuit_name",
+        ["constructor_name", "constructor_nationality", "driver_name", "driver_nationality"]),
+    "constructor": (
+        "constructorId",
+        "constructor_name",
+        ["circuit_name", "driver_name"]),
+    "driver": (
+        "driverId",
+        "driver_name",
+        ["circuit_name", "name_race", "constructor_name"])
+}
+CUBE_DATASETS = ["cube_wins", "cube_summary"]
+RESULT_COLUMNS = sorted(
+    {"raceId", "year", "position"}
+    | {column for id_column, name_column, dimensions in ENTITIES.values()
+       for column in [id_column, name_column, *dimensions]})
+
+#BUILDING THE CUBES FROM THE JOINED RESULTS FRAME
+def build_wins(results):
+    winners = results[results["position"] == 1]
+    frames = []
+    for entity, (id_column, _, dimensions) in ENTITIES.items():
+        for dimension in dimensions:
+            counts = winners.groupby([id_column, dimension], observed = True).size()
+            counts = counts.rename("count").reset_index().rename(
+                columns = {id_column: "entity_id", dimension: "value"})
+            counts["value"] = counts["value"].astype(str)
+            counts.insert(0, "dimension", dimension)
+            counts.insert(0, "entity", entity)
+            frames.append(counts)
+    return pd.concat(frames, ignore_index = True).sort_values(
+        by = ["entity", "entity_id", "dimension", "count"],
+        ascending = [True, True, True, False],
+        ignore_index = True)
+
+def build_summary(results):
+    results = results.assign(
+        win = results["position"].eq(1).fillna(False),
+        podium = results["position"].le(3).fillna(False))
+    frames = []
+    for entity, (id_column, name_column, _) in ENTITIES.items():
+        summary = results.groupby(id_column).agg(
+            name = (name_column, "first"),
+            races = ("raceId", "nunique"),
+            wins = ("win", "sum"),
+            podiums = ("podium", "sum"),
+            first_season = ("year", "min"),
+            last_season = ("year", "max"))
+        summary["name"] = summary["name"].astype(str)
+        summary = summary.rename_axis("entity_id").reset_index()
+        summary.insert(0, "entity", entity)
+        frames.append(summary)
+    return pd.concat(frames, ignore_index = True)
+
+CUBE_BUILDERS = {
+    "cube_wins": build_wins,
+    "cube_summary": build_summary
+}
+
+#LOOKUPS
+class InsightCubes:
+    def __init__(self, wins, summary):
+        #Row positions of every entity in each cube, so a widget change is a
+        #dict lookup plus a slice of a few rows
+        self._wins = wins[["value", "count"]]
+        self._wins_rows = wins.groupby(["entity", "entity_id", "dimension"], observed = True).indices
+        self._summary = {
+            (row["entity"], row["entity_id"]): row
+            for row in summary.to_dict("records")}
+        self._ids = {
+            entity: dict(zip(frame["name"], frame["entity_id"]))
+            for entity, frame in summary.groupby("entity", observed = True)}
+
+    def entity_id(self, entity, name):
+        return self._ids[entity].get(name)
+
+    def wins(self, entity, entity_id, dimension):
+        #Same shape as value_counts().reset_index(): [dimension, "count"]
+        rows = self._wins_rows.get((entity, entity_id, dimension), [])
+        return self._wins.iloc[rows].reset_index(drop = True).rename(columns = {"value": dimension})
+
+    def summary(self, entity, entity_id):
+        return self._summary.get((entity, entity_id))
+
+def _load_cubes():
+    if all(os.path.exists(dataset_path(name)) for name in CUBE_DATASETS):
+        return InsightCubes(*[get_dataset(name) for name in CUBE_DATASETS])
+    #Store not built by pipeline.py yet: aggregate the results frame in memory
+    results = get_dataset("results", columns = RESULT_COLUMNS)
+    return InsightCubes(*[CUBE_BUILDERS[name](results) for name in CUBE_DATASETS])
+
+def load_cubes():
+    return registry.derived("insight_cubes", _load_cubes, depends_on = ["results", *CUBE_DATASETS])
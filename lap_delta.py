@@ -0,0 +1,38 @@
+import numpy as np
+
+def delta_times(tensor, reference, laps):
+    #Cumulative time gap of each (driver, lap number) in laps to the reference
+    #lap, on the distance grid of the session's DistanceTensor. Positive means
+    #slower. Like fastf1.utils.delta_time(), but for every lap at once: one
+    #gather of the Time channel and one subtraction.
+    #Returns (distance, {key: delta}) over the distance the reference lap
+    #covers; laps missing from the tensor are left out
+    reference = (reference[0], int(reference[1]))
+    if not tensor.has_lap(*reference):
+        raise KeyError(f"Lap {reference} is not in the distance tensor")
+    keys = [(driver, int(lap_number)) for driver, lap_number in laps]
+    keys = [key for key in keys if key != reference and tensor.has_lap(*key)]
+    drivers, lap_numbers = zip(reference, *keys)
+    times = tensor.laps(drivers, lap_numbers, "Time")
+    covered = ~np.isnan(times[0])
+    delta = times[1:, covered] - times[0, covered]
+    return tensor.distance[covered], dict(zip(keys, delta))
+
+def lap_delta(tensor, reference, comparison):
+    #Delta of one lap to another, both given as (driver, lap number)
+    distance, deltas = delta_times(tensor, reference, [comparison])
+    return distance, deltas[(comparison[0], int(comparison[1]))]
+
+def field_delta(tensor, fastest_laps, reference_driver = None):
+    #{driver: delta} of every fastest lap (from f1_sessions.pick_fastest_laps())
+    #to the reference driver's fastest lap, the overall fastest by default
+    fastest = fastest_laps.set_index("Driver")["LapNumber"]
+    if reference_driver is None:
+        reference_driver = fastest.index[0]
+    distance, deltas = delta_times(
+        tensor,
+        (reference_driver, fastest[reference_driver]),
+        fastest.drop(reference_driver).items())
+    deltas = {driver: delta for (driver, _), delta in deltas.items()}
+    deltas[reference_driver] = np.zeros(len(distance))
+    return distance, deltas
@@ -0,0 +1,34 @@
+import pandas as pd
+
+#Ergast time strings: "1:27.452" (laps, qualifying), "1:34:50.616" (race time),
+#"+5.478" / "+1:02.345" (gap to the winner), "22.542" (pit stop duration).
+#"\N", "+1 Lap" and any other text do not match and become missing values.
+TIME_PATTERN = (
+    r"^\s*\+?"
+    r"(?:(?:(?P<hours>\d+):)?(?P<minutes>\d+):)?"
+    r"(?P<seconds>\d+)"
+    r"(?:\.(?P<fraction>\d+))?\s*$"
+)
+
+def _time_parts(values):
+    return pd.Series(values, copy = False).astype("string").str.extract(TIME_PATTERN)
+
+def to_milliseconds(values):
+    #One regex pass over the whole column instead of a split() per row
+    parts = _time_parts(values)
+    fraction = parts["fraction"].str.slice(0, 3).str.pad(3, side = "right", fillchar = "0")
+    milliseconds = (
+        pd.to_numeric(parts["hours"]).fillna(0) * 3_600_000
+        + pd.to_numeric(parts["minutes"]).fillna(0) * 60_000
+        + pd.to_numeric(parts["seconds"]) * 1_000
+        + pd.to_numeric(fraction).fillna(0))
+    return milliseconds.round().astype("Int64")
+
+def to_timedelta(values):
+    return pd.to_timedelta(to_milliseconds(values).astype("float64"), unit = "ms")
+
+def parse_time_columns(data, columns, suffix = "_ms"):
+    #Adds an integer-milliseconds companion column for each time-string column
+    for column in columns:
+        data[f"{column}{suffix}"] = to_milliseconds(data[column])
+    return data
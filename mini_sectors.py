@@ -0,0 +1,100 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from single_flight import SingleFlight
+from telemetry_tensor import LapAxis
+
+#Equal-length mini-sectors a lap is split into
+MINI_SECTORS = int(os.getenv("F1_MINI_SECTORS", 25))
+#Mini-sector tables kept in memory, least recently used dropped first
+MINI_SECTOR_ENTRIES = int(os.getenv("F1_MINI_SECTOR_ENTRIES", 16))
+
+def _boundary_times(store, keys, fractions):
+    #Lap time of every lap at each fraction of its own distance, one LapAxis
+    #call for the whole session
+    telemetry = store.laps(keys, ["Distance", "Time"])
+    keys = list(telemetry)
+    if not keys:
+        return keys, np.empty((0, len(fractions)))
+    laps = LapAxis.from_laps(telemetry.values())
+    time = np.concatenate([lap["Time"] for lap in telemetry.values()])
+    times = laps.interpolate(time, fractions[None, :] * laps.last[:, None])
+    #Lap time is 0 where the lap starts, before its first sample
+    times[:, 0] = 0
+    return keys, times
+
+class MiniSectors:
+    def __init__(self, times, reference):
+        #times: mini-sector times in s, indexed by (Driver, LapNumber)
+        self.times = times
+        self.reference = reference
+        self.best = times.groupby(level = "Driver").min()
+        best = self.best.fillna(np.inf).to_numpy()
+        owner = self.best.index.to_numpy()[best.argmin(axis = 0)]
+        #Fastest driver of every mini-sector
+        self.fastest = pd.Series(
+            np.where(np.isfinite(best.min(axis = 0)), owner, None),
+            index = times.columns,
+            name = "Driver")
+
+    def ideal_laps(self):
+        #Best lap and ideal lap (sum of the best mini-sectors) of every driver
+        laps = self.times[self.times.notna().all(axis = 1)].sum(axis = 1)
+        ideal = pd.DataFrame({
+            "BestLap": laps.groupby(level = "Driver").min(),
+            "IdealLap": self.best.sum(axis = 1, min_count = len(self.best.columns))})
+        ideal["Gain"] = ideal["BestLap"] - ideal["IdealLap"]
+        return ideal.dropna().sort_values(by = "IdealLap")
+
+    def theoretical_best(self):
+        #Every mini-sector at the pace of the fastest driver there
+        return float(self.best.min().sum())
+
+    def dominance(self, store):
+        #Reference lap X / Y with the fastest driver of the mini-sector each
+        #sample falls in
+        lap = store.lap(*self.reference, ["X", "Y", "Distance"])
+        fraction = lap["Distance"] / lap["Distance"][-1]
+        sector = np.clip((fraction * len(self.fastest)).astype(int), 0, len(self.fastest) - 1)
+        return pd.DataFrame({
+            "X": lap["X"],
+            "Y": lap["Y"],
+            "MiniSector": sector + 1,
+            "Driver": self.fastest.to_numpy()[sector]})
+
+def build_mini_sectors(store, laps, sectors = MINI_SECTORS):
+    #laps: session.laps; laps without a lap time are left out
+    laps = laps.loc[laps["LapTime"].notna()]
+    fastest = laps.loc[laps["LapTime"].idxmin()]
+    fractions = np.linspace(0, 1, sectors + 1)
+    keys, times = _boundary_times(store, zip(laps["Driver"], laps["LapNumber"]), fractions)
+    times = pd.DataFrame(
+        np.diff(times, axis = 1),
+        index = pd.MultiIndex.from_tuples(keys, names = ["Driver", "LapNumber"]),
+        columns = pd.RangeIndex(1, sectors + 1, name = "MiniSector"))
+    return MiniSectors(times, (fastest["Driver"], int(fastest["LapNumber"])))
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+_builds = SingleFlight()
+
+def _build(session, store, sectors):
+    engine = build_mini_sectors(store, session.laps, sectors)
+    with _engines_lock:
+        _engines[(store.path, sectors)] = engine
+        while len(_engines) > MINI_SECTOR_ENTRIES:
+            _engines.popitem(last = False)
+    return engine
+
+def load_mini_sectors(session, store, sectors = MINI_SECTORS):
+    #Cached per session (telemetry store) and number of mini-sectors; builds
+    #of different sessions run in parallel, concurrent calls for the same one
+    #share its build
+    key = (store.path, sectors)
+    with _engines_lock:
+        if key in _engines:
+            _engines.move_to_end(key)
+            return _engines[key]
+    return _builds.run(key, lambda: _build(session, store, sectors))
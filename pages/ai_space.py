@@ -2,7 +2,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.validators.scatter.marker import SymbolValidator
 import os
-import fastf1
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -10,11 +9,14 @@ from streamlit_extras.grid import grid
 from functions import (
     option_menu,
     page_buttons,
-    image_border_radius,
+    image_border_radius
+    )
+from ml_models import (
     get_scaler_data,
     get_cluster_data,
     get_umap_data
     )
+from dataset_registry import get_dataset
 #MACHINE LEARNING
 from sklearn.metrics import (
     silhouette_score,
@@ -42,9 +44,16 @@ page_buttons()
 st.divider()
 image_border_radius("./assets/formula_one_logo.jpg", 20, 100, 100, grid_title)
 
-data = pd.read_pickle("./data/data_prep1.pkl")
+data = get_dataset("data_prep1")
 data_original_columns = data.columns
-results = pd.read_pickle("./data/results.pkl")
+results = get_dataset("results", columns = [
+    "driver_name",
+    "driver_nationality",
+    "constructor_name",
+    "name_race",
+    "circuit_name",
+    "fastestLapTime"
+])
 results_original_columns = results.columns
 data_original_columns = data_original_columns[
     data_original_columns.isin(
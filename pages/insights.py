@@ -11,10 +11,15 @@ from functions import (
     option_menu,
     image_border_radius,
     page_buttons)
+from dataset_registry import get_dataset
+from insight_cubes import load_cubes
+from query_engine import run_query, TOP_N
+from entity_index import load_index
 
-results = pd.read_pickle("./data/results.pkl")
-constructors_df = pd.read_pickle("./data/constructors.pkl")
-drivers_df = pd.read_pickle("./data/drivers.pkl")
+index = load_index()
+cubes = load_cubes()
+constructors_df = get_dataset("constructors", columns = ["name", "country"])
+drivers_df = get_dataset("drivers", columns = ["name", "country", "country_flag"])
 
 #px.set_mapbox_access_token(open(".mapbox_token").read())
 px.set_mapbox_access_token(os.getenv("MAPBOX_TOKEN"))
@@ -49,27 +54,22 @@ with tabs[0]: #CIRCUITS
     grid_ftr1 = grid(2, vertical_align = True)
     country_filter = grid_ftr1.multiselect(
         label = "Country",
-        options = results["country"].sort_values().unique(),
+        options = index.values("results", "country"),
         default = ["Italy"],
         key = "country1"
     )
     circuit_filter = grid_ftr1.selectbox(
         label = "Circuit",
-        options = results[results["country"].isin(country_filter)]["circuit_name"].sort_values().unique(),
+        options = index.members("country", "circuit_name", country_filter),
         #index = 2
     )
     title_cont.markdown("<i><h1 style='text-align:center'>Circuits</h1></i>", unsafe_allow_html = True)
     title_cont.markdown(f"<i><h3 style='text-align:center'>{circuit_filter}</h3></i>", unsafe_allow_html = True)
-    circuit_insights = results[
-        results["circuit_name"] == circuit_filter]
+    circuit_id = cubes.entity_id("circuit", circuit_filter)
     icols1 = st.columns(2)
     with icols1[0]:
         st.subheader("Winning constructors in this circuit")
-        insight1 = circuit_insights[
-            circuit_insights["position"] == 1
-        ]["constructor_name"].value_counts().reset_index().rename(
-            columns = {"index": "constructor_name", "constructor_name": "count"}
-        )
+        insight1 = cubes.wins("circuit", circuit_id, "constructor_name")
         ifig1 = px.pie(
             insight1,
             names = "constructor_name",
@@ -79,11 +79,7 @@ with tabs[0]: #CIRCUITS
         st.plotly_chart(ifig1)
     with icols1[1]:
         st.subheader("Nationality of the winning constructors in this circuit")
-        insight2 = circuit_insights[
-            circuit_insights["position"] == 1
-        ]["constructor_nationality"].value_counts().reset_index().rename(
-            columns = {"index": "constructor_nationality", "constructor_nationality": "count"}
-        )
+        insight2 = cubes.wins("circuit", circuit_id, "constructor_nationality")
         ifig2 = px.pie(
             insight2,   
             names = "constructor_nationality",
@@ -94,11 +90,7 @@ with tabs[0]: #CIRCUITS
     icols2 = st.columns(2)
     with icols2[0]:
         st.subheader("Winning drivers in this circuit")
-        insight1 = circuit_insights[
-            circuit_insights["position"] == 1
-        ]["driver_name"].value_counts().reset_index().rename(
-            columns = {"index": "driver_name", "driver_name": "count"}
-        )
+        insight1 = cubes.wins("circuit", circuit_id, "driver_name")
         ifig1 = px.pie(
             insight1,
             names = "driver_name",
@@ -108,11 +100,7 @@ with tabs[0]: #CIRCUITS
         st.plotly_chart(ifig1)
     with icols2[1]:
         st.subheader("Nationality of the winning drivers in this circuit")
-        insight2 = circuit_insights[
-            circuit_insights["position"] == 1
-        ]["driver_nationality"].value_counts().reset_index().rename(
-            columns = {"index": "driver_nationality", "driver_nationality": "count"}
-        )
+        insight2 = cubes.wins("circuit", circuit_id, "driver_nationality")
         ifig2 = px.pie(
             insight2,
             names = "driver_nationality",
@@ -122,9 +110,10 @@ with tabs[0]: #CIRCUITS
         st.plotly_chart(ifig2)
     st.divider()
     st.subheader(f"The fastest laps in this circuit - {circuit_filter}")
-    insight3 = circuit_insights[
-        circuit_insights["fastestLapTime"].notnull()
-        ].sort_values(by = "fastestLapTime")[[
+    insight3 = run_query(
+        "circuit_fastest_laps",
+        entity_id = circuit_id,
+        limit = TOP_N)[[
         "year",
         "round",
         "name_race",
@@ -175,27 +164,22 @@ with tabs[1]: #CONSTRUCTORS
     grid_ftr1 = grid(2, vertical_align = True)
     country_filter = grid_ftr1.multiselect(
         label = "Nationality",
-        options = results["constructor_nationality"].sort_values().unique(),
+        options = index.values("results", "constructor_nationality"),
         default = ["Austrian"],
         key = "country2"
     )
     constructor_filter = grid_ftr1.selectbox(
         label = "Constructor",
-        options = results[results["constructor_nationality"].isin(country_filter)]["constructor_name"].sort_values().unique(),
+        options = index.members("constructor_nationality", "constructor_name", country_filter),
         #index = 50
     )
     title_cont.markdown("<i><h1 style='text-align:center'>Constructors</h1></i>", unsafe_allow_html = True)
     title_cont.markdown(f"<i><h3 style='text-align:center'>{constructor_filter}</h3></i>", unsafe_allow_html = True)
-    constructor_insights = results[
-        results["constructor_name"] == constructor_filter]
+    constructor_id = cubes.entity_id("constructor", constructor_filter)
     icols1 = st.columns(2)
     with icols1[0]:
         st.subheader("Circuits most won by this constructor")
-        insight1 = constructor_insights[
-            constructor_insights["position"] == 1
-        ]["circuit_name"].value_counts().reset_index().rename(
-            columns = {"index": "circuit_name", "circuit_name": "count"}
-        )
+        insight1 = cubes.wins("constructor", constructor_id, "circuit_name")
         ifig1 = px.pie(
             insight1,
             names = "circuit_name",
@@ -205,11 +189,7 @@ with tabs[1]: #CONSTRUCTORS
         st.plotly_chart(ifig1)
     with icols1[1]:
         st.subheader("Winning drivers by this constructor")
-        insight2 = constructor_insights[
-            constructor_insights["position"] == 1
-        ]["driver_name"].value_counts().reset_index().rename(
-            columns = {"index": "driver_name", "driver_name": "count"}
-        )
+        insight2 = cubes.wins("constructor", constructor_id, "driver_name")
         ifig2 = px.pie(
             insight2,
             names = "driver_name",
@@ -219,9 +199,10 @@ with tabs[1]: #CONSTRUCTORS
         st.plotly_chart(ifig2)
     st.divider()
     st.subheader(f"The fastest laps by cars of this constructor - {constructor_filter}")
-    insight3 = constructor_insights[
-        constructor_insights["fastestLapTime"].notnull()
-        ].sort_values(by = "fastestLapTime")[[
+    insight3 = run_query(
+        "constructor_fastest_laps",
+        entity_id = constructor_id,
+        limit = TOP_N)[[
         "year",
         "round",
         "name_race",
@@ -272,27 +253,22 @@ with tabs[2]: #DRIVERS
     grid_ftr1 = grid(2, vertical_align = True)
     country_filter = grid_ftr1.multiselect(
         label = "Nationality",
-        options = results["driver_nationality"].sort_values().unique(),
+        options = index.values("results", "driver_nationality"),
         default = ["French"],
         key = "country3"
     )
     driver_filter = grid_ftr1.selectbox(
         label = "Driver",
-        options = results[results["driver_nationality"].isin(country_filter)]["driver_name"].sort_values().unique(),
+        options = index.members("driver_nationality", "driver_name", country_filter),
         #index = 279
     )
     title_cont.markdown("<i><h1 style='text-align:center'>Drivers</h1></i>", unsafe_allow_html = True)
     title_cont.markdown(f"<i><h3 style='text-align:center'>{driver_filter}</h3></i>", unsafe_allow_html = True)
-    driver_insights = results[
-        results["driver_name"] == driver_filter]
+    driver_id = cubes.entity_id("driver", driver_filter)
     icols1 = st.columns(2)
     with icols1[0]:
         st.subheader("Circuits most won by this driver")
-        insight1 = driver_insights[
-            driver_insights["position"] == 1
-        ]["circuit_name"].value_counts().reset_index().rename(
-            columns = {"index": "circuit_name", "circuit_name": "count"}
-        )
+        insight1 = cubes.wins("driver", driver_id, "circuit_name")
         ifig1 = px.pie(
             insight1,
             names = "circuit_name",
@@ -302,11 +278,7 @@ with tabs[2]: #DRIVERS
         st.plotly_chart(ifig1)
     with icols1[1]:
         st.subheader("Grand Prix most won by this driver")
-        insight2 = driver_insights[
-            driver_insights["position"] == 1
-        ]["name_race"].value_counts().reset_index().rename(
-            columns = {"index": "name_race", "name_race": "count"}
-        )
+        insight2 = cubes.wins("driver", driver_id, "name_race")
         ifig2 = px.pie(
             insight2,
             names = "name_race",
@@ -317,11 +289,7 @@ with tabs[2]: #DRIVERS
     icols2 = st.columns(2)
     with icols2[0]:
         st.subheader("Constructor winning by this driver")
-        insight3 = driver_insights[
-            driver_insights["position"] == 1
-        ]["constructor_name"].value_counts().reset_index().rename(
-            columns = {"index": "constructor_name", "constructor_name": "count"}
-        )
+        insight3 = cubes.wins("driver", driver_id, "constructor_name")
         ifig3 = px.pie(
             insight3,
             names = "constructor_name",
@@ -331,9 +299,10 @@ with tabs[2]: #DRIVERS
         st.plotly_chart(ifig3)
     st.divider()
     st.subheader(f"The fastest laps by cars of this driver - {driver_filter}")
-    insight4 = driver_insights[
-        driver_insights["fastestLapTime"].notnull()
-        ].sort_values(by = "fastestLapTime")[[
+    insight4 = run_query(
+        "driver_fastest_laps",
+        entity_id = driver_id,
+        limit = TOP_N)[[
         "year",
         "round",
         "name_race",
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import os
 import plotly.express as px
 import plotly.graph_objects as go
@@ -9,6 +8,9 @@ from functions import (
     option_menu,
     image_border_radius,
     page_buttons)
+from dataset_registry import get_dataset
+from entity_index import load_index
+from query_engine import run_query
 
 #px.set_mapbox_access_token(open(".mapbox_token").read())
 px.set_mapbox_access_token(os.getenv("MAPBOX_TOKEN"))
@@ -22,11 +24,11 @@ st.set_page_config(
 option_menu()
 
 #LOADING DATA
-circuits = pd.read_pickle("./data/circuits.pkl")
-constructors = pd.read_pickle("./data/constructors.pkl")
-drivers = pd.read_pickle("./data/drivers.pkl")
-races_circuits = pd.read_pickle("./data/races_circuits.pkl")
-results = pd.read_pickle("./data/results.pkl")
+circuits = get_dataset("circuits")
+constructors = get_dataset("constructors")
+drivers = get_dataset("drivers")
+races_circuits = get_dataset("races_circuits")
+index = load_index()
 
 grid_title = grid([5, 1], vertical_align = True)
 container1 = grid_title.container()
@@ -286,44 +288,21 @@ with tabs[2]: #DRIVERS
             use_container_width = True)
     st.divider()
     st.header("About the drivers")
-    filtered_data = drivers.copy()[[
-        "country",
-        "continent",
-        "name",
-        "number",
-        "code",
-        "dob",
-        "age",
-        "url"
-    ]]
-    filtered_data.columns = [
-        "Country",
-        "Continent",
-        "Name",
-        "Number",
-        "Code",
-        "Date of birth",
-        "Age",
-        "URL (about the driver)"
-    ]
     grid_ftr = grid(2, vertical_align = True)
     ftr1 = grid_ftr.multiselect(
         label = "Country",
-        options = drivers["country"].sort_values().unique()
+        options = index.values("drivers", "country"),
+        key = "drivers_country"
     )
     ftr2 = grid_ftr.multiselect(
         label = "Continent",
-        options = drivers["continent"].sort_values().unique()
+        options = index.values("drivers", "continent"),
+        key = "drivers_continent"
     )
-    if (ftr1 == [] and ftr2 == []):
-        pass
-    else:
-        filtered_data = filtered_data[
-            (filtered_data["Country"].isin(ftr1))
-            |
-            (filtered_data["Continent"].isin(ftr2))].sort_values(
-                by = ["Country", "Continent", "Name"]
-            ).reset_index(drop = True)
+    filtered_data = run_query(
+        "drivers_table",
+        countries = ftr1,
+        continents = ftr2)
     filtered_data = filtered_data.to_html(render_links = True)
     scrollable_df = f"""
     <div style="height: 400px;overflow: scroll;">
@@ -360,19 +339,7 @@ with tabs[3]: #RACES
     st.plotly_chart(
         fig1,
         use_container_width = True)
-    df2 = races_circuits[[
-        "name_circuit",
-        "location",
-        "country",
-        "lat",
-        "lng",
-        "continent"
-    ]].groupby([
-        "name_circuit",
-        "location",
-        "country",
-        "lat",
-        "lng"]).count().reset_index().rename(columns = {"continent": "count"})
+    df2 = run_query("races_by_circuit")
     fig2 = px.scatter_mapbox(
         df2,
         lat = "lat",
@@ -452,66 +419,45 @@ with tabs[3]: #RACES
             use_container_width = True)
     st.divider()
     st.header("About the races")
-    filtered_data = races_circuits[[
-        "name_race",
-        "year",
-        "date",
-        "name_circuit",
-        "location",
-        "country",
-        "continent",
-        "url_race"
-    ]].sort_values(by = "date", ascending = False).reset_index(drop = True)
-    filtered_data.columns = [
-        "Grand Prix",
-        "Year",
-        "Date",
-        "Circuit",
-        "Location",
-        "Country",
-        "Continent",
-        "About (Race)"]
     grid_ftr = grid(6, vertical_align = True)
     ftr1 = grid_ftr.multiselect(
         label = "Grand Prix",
-        options = races_circuits["name_race"].sort_values().unique()
+        options = index.values("races_circuits", "name_race"),
+        key = "races_grand_prix"
     )
     ftr2 = grid_ftr.multiselect(
         label = "Year",
-        options = races_circuits["year"].sort_values(ascending = False).unique()
+        options = index.values("races_circuits", "year")[::-1],
+        key = "races_year"
     )
     ftr3 = grid_ftr.multiselect(
         label = "Circuit",
-        options = races_circuits["name_circuit"].sort_values().unique()
+        options = index.values("races_circuits", "name_circuit"),
+        key = "races_circuit"
     )
     ftr4 = grid_ftr.multiselect(
         label = "Location",
-        options = races_circuits["location"].sort_values().unique()
+        options = index.values("races_circuits", "location"),
+        key = "races_location"
     )
     ftr5 = grid_ftr.multiselect(
         label = "Country",
-        options = races_circuits["country"].sort_values().unique()
+        options = index.values("races_circuits", "country"),
+        key = "races_country"
     )
     ftr6 = grid_ftr.multiselect(
         label = "Continent",
-        options = races_circuits["continent"].sort_values().unique()
+        options = index.values("races_circuits", "continent"),
+        key = "races_continent"
     )
-    if (ftr1 == [] and ftr2 == [] and ftr3 == [] and ftr4 == [] and ftr5 == [] and ftr6 == []):
-        pass
-    else:
-        filtered_data = filtered_data[
-            (filtered_data["Grand Prix"].isin(ftr1))
-            |
-            (filtered_data["Year"].isin(ftr2))
-            |
-            (filtered_data["Circuit"].isin(ftr3))
-            |
-            (filtered_data["Location"].isin(ftr4))
-            |
-            (filtered_data["Country"].isin(ftr5))
-            |
-            (filtered_data["Continent"].isin(ftr6))
-            ].reset_index(drop = True)
+    filtered_data = run_query(
+        "races_table",
+        races = ftr1,
+        years = ftr2,
+        circuits = ftr3,
+        locations = ftr4,
+        countries = ftr5,
+        continents = ftr6)
     filtered_data = filtered_data.to_html(render_links = True)
     scrollable_df = f"""
     <div style="height: 400px;overflow: scroll;">
@@ -4,23 +4,26 @@ import numpy as np
 import os
 import fastf1
 import fastf1.plotting
-from fastf1.core import Laps
-from fastf1.ergast import Ergast
 from timple.timedelta import strftimedelta
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib.collections import LineCollection
-from matplotlib import cm
 from streamlit_extras.grid import grid
 from streamlit_extras.switch_page_button import switch_page
 from functions import (
     option_menu,
     image_border_radius,
-    load_f1_session,
-    season_results,
     page_buttons)
+from f1_sessions import load_f1_session, pick_fastest_laps, season_results
+from session_prefetch import prefetch_season
+from season_points import SEASONS, precompute_season_points
+from telemetry_store import load_telemetry_store, store_circuit_info
+from telemetry_tensor import load_distance_tensor
+from lap_delta import field_delta
+from mini_sectors import load_mini_sectors
+from downsampling import downsample, minmax_indices, trace_points
+from track_charts import track_map_image, gear_map_image, speed_map_image
+from session_charts import position_figure, tyre_strategy_figure, lap_time_distribution_figure
+from entity_index import load_index
 
 #px.set_mapbox_access_token(open(".mapbox_token").read())
 px.set_mapbox_access_token(os.getenv("MAPBOX_TOKEN"))
@@ -38,9 +41,7 @@ st.set_page_config(
 
 option_menu()
 
-races = pd.read_csv("./data/races.csv")
-results = pd.read_pickle("./data/results.pkl")
-drivers_df = pd.read_pickle("./data/drivers.pkl")
+index = load_index()
 
 grid_title = grid([5, 1], vertical_align = True)
 container1 = grid_title.container()
@@ -52,22 +53,19 @@ page_buttons()
 st.divider()
 image_border_radius("./assets/formula_one_logo.jpg", 20, 100, 100, grid_title)
 
-ergast = Ergast()
+TELEMETRY_HINT = "Turn on telemetry charts above to load car and position data for this session."
 
 col_ftr = st.columns(3)
 with col_ftr[0]:
     season_ftr = st.selectbox(
         label = "Season",
-        options = [2023, 2022, 2021, 2020, 2019]
+        options = SEASONS
     )
-    race_option_ftr = races[races["year"] == season_ftr][[
-        "name",
-        "round"
-    ]].sort_values(by = "round")
+    race_option_ftr = index.season_rounds(season_ftr)
 with col_ftr[1]:
     race_ftr = st.selectbox(
         label = "Race",
-        options = race_option_ftr["name"]
+        options = list(race_option_ftr)
     )
 with col_ftr[2]:
     session_ftr = st.selectbox(
@@ -84,11 +82,31 @@ with col_ftr[2]:
         index = 6
     )
 
+telemetry_ftr = st.toggle(
+    label = "Telemetry charts (track maps and speed traces)",
+    value = False
+)
+
+#Championship points of every season, built in the background once per process
+precompute_season_points()
+#Warm the other rounds of the season in the background
+prefetch_season(
+    season_ftr,
+    race_option_ftr.values(),
+    first_round = race_option_ftr[race_ftr]
+)
+
 session = load_f1_session(
     season_ftr,
-    race_option_ftr[race_option_ftr["name"] == race_ftr]["round"].iloc[0],
+    race_option_ftr[race_ftr],
     session_ftr
 )
+#Telemetry charts read per-lap slices of the on-disk telemetry store
+store = load_telemetry_store(
+    season_ftr,
+    race_option_ftr[race_ftr],
+    session_ftr
+) if telemetry_ftr else None
 
 st.write(f'<i><h1 style="text-align:center;">{session.event["OfficialEventName"]}</h1></i>', unsafe_allow_html = True)
 
@@ -101,127 +119,103 @@ with tabs[0]: #CHAMPIONSHIP
     cols1 = st.columns(2)
     with cols1[0]:
         st.subheader("Circuit (track map)")
-        lap = session.laps.pick_fastest()
-        pos = lap.get_pos_data()
-        circuit_info = session.get_circuit_info()
-        # Define a helper function for rotating points
-        def rotate(xy, *, angle):
-            rot_mat = np.array([[np.cos(angle), np.sin(angle)],
-                                [-np.sin(angle), np.cos(angle)]])
-            return np.matmul(xy, rot_mat)
-        # Get the coordinates of the track map and rotate them
-        track = pos.loc[:, ('X', 'Y')].to_numpy()
-        track_angle = circuit_info.rotation / 180 * np.pi
-        rotated_track = rotate(track, angle=track_angle)
-        # Create a figure and an ax element
-        fig, ax = plt.subplots()
-        ax.plot(rotated_track[:, 0], rotated_track[:, 1], 'r')  # Plotting the track map
-        # Define an offset vector for corner numbers
-        offset_vector = [500, 0]
-        # Annotate each corner
-        for _, corner in circuit_info.corners.iterrows():
-            txt = f"{corner['Number']}{corner['Letter']}"
-            offset_angle = corner['Angle'] / 180 * np.pi
-            offset_x, offset_y = rotate(offset_vector, angle=offset_angle)
-            text_x, text_y = corner['X'] + offset_x, corner['Y'] + offset_y
-            text_x, text_y = rotate([text_x, text_y], angle=track_angle)
-            track_x, track_y = rotate([corner['X'], corner['Y']], angle=track_angle)
-
-            ax.scatter(text_x, text_y, color='grey', s=140)
-            ax.plot([track_x, text_x], [track_y, text_y], color='grey')
-            ax.text(text_x, text_y, txt, va='center', ha='center', size='small', color='white')
-        # Customize the plot
-        ax.set_title(f"{session.event['Location']} - {session.event['Country']} ({session.total_laps} laps)")
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_aspect('equal')
-        st.pyplot(ax.figure)
+        if telemetry_ftr:
+            # Rendered once per session from the track geometry cached per circuit
+            st.image(
+                track_map_image(session, store, season_ftr, race_option_ftr[race_ftr], session_ftr),
+                use_column_width = True
+            )
+        else:
+            st.info(TELEMETRY_HINT)
     with cols1[1]:
         st.subheader("Gear shifts on track")
-        lap = session.laps.pick_fastest()
-        tel = lap.get_telemetry()
-        x = np.array(tel['X'].values)
-        y = np.array(tel['Y'].values)
-        points = np.array([x, y]).T.reshape(-1, 1, 2)
-        segments = np.concatenate([points[:-1], points[1:]], axis=1)
-        gear = tel['nGear'].to_numpy().astype(float)
-        fig, ax = plt.subplots()
-        cmap = cm.get_cmap('Paired')
-        lc_comp = LineCollection(segments, norm=plt.Normalize(1, cmap.N+1), cmap=cmap)
-        lc_comp.set_array(gear)
-        lc_comp.set_linewidth(4)
-        ax.add_collection(lc_comp)
-        ax.axis('equal')
-        ax.tick_params(labelleft=False, left=False, labelbottom=False, bottom=False)
-        title = plt.suptitle(
-            f"Fastest Lap Gear Shift Visualization\n"
-            f"{lap['Driver']} - {session.event['EventName']} {session.event.year} {session_ftr}"
-        )
-        cbar = plt.colorbar(mappable=lc_comp, label="Gear", boundaries=np.arange(1, 10))
-        cbar.set_ticks(np.arange(1.5, 9.5))
-        cbar.set_ticklabels(np.arange(1, 9))
-        st.pyplot(ax.figure)
+        if telemetry_ftr:
+            st.image(
+                gear_map_image(session, store, season_ftr, race_option_ftr[race_ftr], session_ftr),
+                use_column_width = True
+            )
+        else:
+            st.info(TELEMETRY_HINT)
     for i in range(3):
         st.write("")
     cols2 = st.columns(2)
     with cols2[0]:
         st.subheader("Position changes")
-        fig1 = go.Figure()
-        for drv in session.drivers:
-            drv_laps = session.laps.pick_driver(drv)
-            try:
-                fig1.add_trace(
-                    go.Scatter(
-                        x = drv_laps["LapNumber"],
-                        y = drv_laps["Position"],
-                        mode = "markers+lines",
-                        name = drv_laps['Driver'].iloc[0],
-                        marker = {"size": 8}
-                    )
-            )
-            except:
-                pass
-        fig1.update_layout(
-            xaxis_title = "Lap Number",
-            yaxis_title = "Position",
-            yaxis_tickmode = "linear"
-        )
-        fig1.update_yaxes(autorange = "reversed")
-        st.plotly_chart(fig1)
+        st.plotly_chart(position_figure(session, season_ftr, race_option_ftr[race_ftr], session_ftr))
     with cols2[1]:
         st.subheader(f"Driver standings ({season_ftr})")
-        season_results(ergast, season_ftr)
+        season_results(season_ftr)
     cols3 = st.columns(2)
     with cols3[0]:
         st.subheader("Overlaying speed traces of fastest laps")
-        drivers = st.multiselect(
-            label = "Drivers",
-            options = session.laps["Driver"].unique(),
-            default = session.laps["Driver"].unique(),
-            key = "drivers_multiselect"
-        )
-        fig2 = go.Figure()
-        for driver in drivers:
-            try:
-                fastest_lap = session.laps.pick_driver(driver).pick_fastest()
-                telemetry = fastest_lap.get_car_data().add_distance()
-                fig2.add_trace(
-                    go.Scatter(
-                        x = telemetry["Distance"],
-                        y = telemetry["Speed"],
-                        mode = "lines",
-                        name = driver
+        if telemetry_ftr:
+            drivers = st.multiselect(
+                label = "Drivers",
+                options = session.laps["Driver"].unique(),
+                default = session.laps["Driver"].unique(),
+                key = "drivers_multiselect"
+            )
+            #Every driver's fastest lap from one groupby and one gather of the
+            #distance tensor (fastest laps x distance grid)
+            tensor = load_distance_tensor(season_ftr, race_option_ftr[race_ftr], session_ftr)
+            fastest_laps = pick_fastest_laps(session.laps)
+            fastest_laps = fastest_laps[[
+                tensor.has_lap(driver, lap_number)
+                for driver, lap_number in zip(fastest_laps["Driver"], fastest_laps["LapNumber"])]]
+            speeds = dict(zip(
+                fastest_laps["Driver"],
+                tensor.laps(fastest_laps["Driver"], fastest_laps["LapNumber"], "Speed")))
+            fig2 = go.Figure()
+            for driver in drivers:
+                if driver in speeds:
+                    covered = ~np.isnan(speeds[driver])
+                    telemetry = downsample(
+                        {"Distance": tensor.distance[covered], "Speed": speeds[driver][covered]},
+                        ["Speed"],
+                        trace_points(len(drivers)))
+                    fig2.add_trace(
+                        go.Scatter(
+                            x = telemetry["Distance"],
+                            y = telemetry["Speed"],
+                            mode = "lines",
+                            name = driver
+                        )
                     )
-                )
-            except:
-                pass
-        fig2.update_layout(
-            xaxis_title = "Distance in m",
-            yaxis_title = "Speed in km/h",
-            title = "Fastest Lap Comparison<br>"
-                    f"{session.event['EventName']} {session.event.year} {session_ftr}"
-        )
-        st.plotly_chart(fig2)
+            fig2.update_layout(
+                xaxis_title = "Distance in m",
+                yaxis_title = "Speed in km/h",
+                title = "Fastest Lap Comparison<br>"
+                        f"{session.event['EventName']} {session.event.year} {session_ftr}"
+            )
+            st.plotly_chart(fig2)
+            st.subheader("Delta time to a reference lap")
+            reference_driver = st.selectbox(
+                label = "Reference lap",
+                options = fastest_laps["Driver"],
+                key = "delta_reference_selectbox"
+            )
+            distance, deltas = field_delta(tensor, fastest_laps, reference_driver)
+            fig_delta = go.Figure()
+            for driver in drivers:
+                if driver in deltas:
+                    delta = downsample({"Distance": distance, "Delta": deltas[driver]}, ["Delta"], trace_points(len(drivers)))
+                    fig_delta.add_trace(
+                        go.Scatter(
+                            x = delta["Distance"],
+                            y = delta["Delta"],
+                            mode = "lines",
+                            name = driver
+                        )
+                    )
+            fig_delta.update_layout(
+                xaxis_title = "Distance in m",
+                yaxis_title = f"Gap to {reference_driver} in s",
+                title = f"Delta time to the fastest lap of {reference_driver}<br>"
+                        f"{session.event['EventName']} {session.event.year} {session_ftr}"
+            )
+            st.plotly_chart(fig_delta)
+        else:
+            st.info(TELEMETRY_HINT)
     for i in range(3):
         st.write("")
     with cols3[1]:
@@ -257,96 +251,116 @@ with tabs[0]: #CHAMPIONSHIP
     cols4 = st.columns(2)
     with cols4[0]:
         st.subheader("Tyre strategies")
-        laps = session.laps
-        # Get driver abbreviations
-        drivers = [session.get_driver(driver)["Abbreviation"] for driver in session.drivers]
-        # Group and count laps for stint data
-        stints = laps[["Driver", "Stint", "Compound", "LapNumber"]]
-        stints = stints.groupby(["Driver", "Stint", "Compound"]).count().reset_index()
-        stints = stints.rename(columns={"LapNumber": "StintLength"})
-        fig = go.Figure()
-        for driver in drivers:
-            driver_stints = stints[stints["Driver"] == driver]
-            previous_stint_end = 0
-            for _, row in driver_stints.iterrows():
+        st.plotly_chart(tyre_strategy_figure(session, season_ftr, race_option_ftr[race_ftr], session_ftr))
+    with cols4[1]:
+        st.subheader("Speed traces with corners (fastest lap)")
+        if telemetry_ftr:
+            # Select the fastest lap and get car telemetry data for this lap
+            fastest_lap = session.laps.pick_fastest()
+            car_data = downsample(store.lap(fastest_lap["Driver"], fastest_lap["LapNumber"], ["Distance", "Speed"]), ["Speed"])
+            # Load circuit info
+            circuit_info = store_circuit_info(session, store)
+            # Create a plotly figure
+            fig = go.Figure()
+            # Add speed trace
+            team_color = fastf1.plotting.team_color(fastest_lap['Team'])
+            fig.add_trace(
+                go.Scatter(
+                    x = car_data['Distance'], 
+                    y = car_data['Speed'],
+                    mode = 'lines', 
+                    name = fastest_lap['Driver'],
+                    line = dict(color = team_color)
+                    ))
+            # Get min and max speed for setting y-axis limits
+            v_min = car_data['Speed'].min()
+            v_max = car_data['Speed'].max()
+            # Add annotations for each corner
+            for _, corner in circuit_info.corners.iterrows():
+                fig.add_shape(
+                    type = "line",
+                    x0 = corner['Distance'], 
+                    y0 = v_min - 20, 
+                    x1 = corner['Distance'], 
+                    y1 = v_max + 20,
+                    line = dict(
+                        color = "grey", 
+                        width = 1, 
+                        dash = "dot"))
+                fig.add_annotation(
+                    x = corner['Distance'], 
+                    y = v_min-30,
+                    text = f"{corner['Number']}{corner['Letter']}",
+                    showarrow = False, 
+                    yshift = 10)
+            # Update layout
+            fig.update_layout(
+                title = "Speed Trace with Corner Annotations",
+                xaxis_title = "Distance in m",
+                yaxis_title = "Speed in km/h",
+                yaxis_range = [v_min - 40, v_max + 20],
+                showlegend = True
+            )
+            st.plotly_chart(fig)
+        else:
+            st.info(TELEMETRY_HINT)
+    for i in range(3):
+        st.write("")
+    cols_mini = st.columns(2)
+    with cols_mini[0]:
+        st.subheader("Track dominance (mini-sectors)")
+        if telemetry_ftr:
+            mini_sectors = load_mini_sectors(session, store)
+            dominance = mini_sectors.dominance(store)
+            dominance = dominance.iloc[minmax_indices(dominance[["X", "Y", "MiniSector"]])]
+            fig = go.Figure()
+            owner = dominance["Driver"].to_numpy()
+            for driver in pd.unique(owner[owner != None]):
+                #The first sample of the next mini-sector closes the line
+                drawn = (owner == driver) | np.roll(owner == driver, 1)
                 fig.add_trace(
-                    go.Bar(
-                        y = [driver],
-                        x = [row["StintLength"]],
-                        name = row["Compound"],
-                        orientation = 'h',
-                        marker_color = fastf1.plotting.COMPOUND_COLORS[row["Compound"]],
-                        base = previous_stint_end
+                    go.Scatter(
+                        x = dominance["X"].where(drawn),
+                        y = dominance["Y"].where(drawn),
+                        mode = "lines",
+                        line = dict(width = 6),
+                        name = driver
                     )
                 )
-                previous_stint_end += row["StintLength"]
-        fig.update_layout(
-            barmode = 'stack',
-            title = f"{session.event['EventName']} {session.event.year} {session_ftr} - Tyre Strategies",
-            xaxis_title = "Lap Number",
-            yaxis = {'categoryorder':'total ascending'},  # Sort drivers
-            legend_title = "Tyre Compound",
-            yaxis_tickmode = "linear"
-        )
-        st.plotly_chart(fig)
-    with cols4[1]:
-        st.subheader("Speed traces with corners (fastest lap)")
-        # Select the fastest lap and get car telemetry data for this lap
-        fastest_lap = session.laps.pick_fastest()
-        car_data = fastest_lap.get_car_data().add_distance()
-        # Load circuit info
-        circuit_info = session.get_circuit_info()
-        # Create a plotly figure
-        fig = go.Figure()
-        # Add speed trace
-        team_color = fastf1.plotting.team_color(fastest_lap['Team'])
-        fig.add_trace(
-            go.Scatter(
-                x = car_data['Distance'], 
-                y = car_data['Speed'],
-                mode = 'lines', 
-                name = fastest_lap['Driver'],
-                line = dict(color = team_color)
-                ))
-        # Get min and max speed for setting y-axis limits
-        v_min = car_data['Speed'].min()
-        v_max = car_data['Speed'].max()
-        # Add annotations for each corner
-        for _, corner in circuit_info.corners.iterrows():
-            fig.add_shape(
-                type = "line",
-                x0 = corner['Distance'], 
-                y0 = v_min - 20, 
-                x1 = corner['Distance'], 
-                y1 = v_max + 20,
-                line = dict(
-                    color = "grey", 
-                    width = 1, 
-                    dash = "dot"))
-            fig.add_annotation(
-                x = corner['Distance'], 
-                y = v_min-30,
-                text = f"{corner['Number']}{corner['Letter']}",
-                showarrow = False, 
-                yshift = 10)
-        # Update layout
-        fig.update_layout(
-            title = "Speed Trace with Corner Annotations",
-            xaxis_title = "Distance in m",
-            yaxis_title = "Speed in km/h",
-            yaxis_range = [v_min - 40, v_max + 20],
-            showlegend = True
-        )
-        st.plotly_chart(fig)
+            fig.update_layout(
+                title = f"Fastest driver per mini-sector ({len(mini_sectors.fastest)} mini-sectors)<br>"
+                        f"{session.event['EventName']} {session.event.year} {session_ftr}",
+                xaxis = dict(visible = False),
+                yaxis = dict(visible = False, scaleanchor = "x"),
+                legend_title = "Driver"
+            )
+            st.plotly_chart(fig)
+        else:
+            st.info(TELEMETRY_HINT)
+    with cols_mini[1]:
+        st.subheader("Ideal lap")
+        if telemetry_ftr:
+            ideal_laps = mini_sectors.ideal_laps().reset_index()
+            theoretical_best = pd.Timedelta(seconds = mini_sectors.theoretical_best())
+            st.write(f"Theoretical best lap (fastest driver in every mini-sector): **{strftimedelta(theoretical_best, '%m:%s.%ms')}**")
+            st.dataframe(
+                ideal_laps.rename(columns = {
+                    "BestLap": "Best lap (s)",
+                    "IdealLap": "Ideal lap (s)",
+                    "Gain": "Gain (s)"
+                }).round(3),
+                hide_index = True,
+                use_container_width = True
+            )
+        else:
+            st.info(TELEMETRY_HINT)
     for i in range(3):
         st.write("")
     cols5 = st.columns(2)
     with cols5[0]:
         st.subheader("Qualifying results overview")
-        # Get an array of all drivers and their fastest laps
-        drivers = pd.unique(session.laps['Driver'])
-        list_fastest_laps = [session.laps.pick_driver(drv).pick_fastest() for drv in drivers]
-        fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
+        # Get the fastest lap of every driver, sorted by lap time
+        fastest_laps = pick_fastest_laps(session.laps)
         # Calculate time delta from the fastest lap
         pole_lap = fastest_laps.pick_fastest()
         fastest_laps['LapTimeDelta'] = fastest_laps['LapTime'] - pole_lap['LapTime']
@@ -378,59 +392,15 @@ with tabs[0]: #CHAMPIONSHIP
         st.plotly_chart(fig)
     with cols5[1]:
         st.subheader("Driver laptimes distribution")
-        # Get all the laps for the point finishers only and filter out slow laps
-        point_finishers = session.drivers[:10]
-        driver_laps = session.laps.pick_drivers(point_finishers).pick_quicklaps().reset_index()
-        # Convert the lap times to seconds
-        driver_laps["LapTime(s)"] = driver_laps["LapTime"].dt.total_seconds()
-        # Get finishing order and modify the color palette
-        finishing_order = [session.get_driver(i)["Abbreviation"] for i in point_finishers]
-        # Create the violin plot
-        fig = go.Figure()
-        # Add traces for each driver
-        for driver in finishing_order:
-            fig.add_trace(
-                go.Violin(
-                    x = driver_laps[driver_laps['Driver'] == driver]['Driver'],
-                    y = driver_laps[driver_laps['Driver'] == driver]['LapTime(s)'],
-                    name = driver,
-                ))
-        # Map compounds to colors
-        compound_colors = {'SOFT': 'red', 'MEDIUM': 'yellow', 'HARD': 'blue'}  # Example mapping
-        driver_laps['CompoundColor'] = driver_laps['Compound'].map(compound_colors)
-        # Add swarmplot (scatter plot)
-        fig.add_trace(
-            go.Scatter(
-                x = driver_laps['Driver'],
-                y = driver_laps['LapTime(s)'],
-                mode = 'markers',
-                marker = dict(
-                    color = driver_laps['CompoundColor'], 
-                    symbol = 'circle', 
-                    size = 5),
-            ))
-        # Update layout
-        fig.update_layout(
-            title = f"{session.event['EventName']} {session.event.year} {session_ftr} - Lap Time Distributions",
-            xaxis_title = "Driver",
-            yaxis_title = "Lap Time (s)",
-            yaxis = dict(
-                categoryorder = 'array', 
-                categoryarray = finishing_order),
-            showlegend = False
-        )
-        st.plotly_chart(fig)
+        st.plotly_chart(lap_time_distribution_figure(session, season_ftr, race_option_ftr[race_ftr], session_ftr))
 with tabs[1]: #DRIVERS
-    race_drivers = results[results["year"] == season_ftr]
-    drivers_id = race_drivers["driverId"].unique()
-    drivers_options = drivers_df[drivers_df["driverId"].isin(drivers_id)]
     driver_name = st.selectbox(
         label = "Driver",
-        options = drivers_options["name"],
+        options = index.season_drivers(season_ftr),
         key = "driver_selectbox"
     )
-    driver_code = drivers_options[drivers_options["name"] == driver_name]["code"].iloc[0]
-    driver_image_url_surname = drivers_options[drivers_options["name"] == driver_name]["surname"].str.lower().str.replace(" ", "").iloc[0]
+    driver_code = index.driver(driver_name)["code"]
+    driver_image_url_surname = index.driver(driver_name)["surname"].lower().replace(" ", "")
     driver_image_url = f"https://media.formula1.com/content/dam/fom-website/drivers/{season_ftr}Drivers/{driver_image_url_surname}.jpg"
     driver_constructor = session.results[
         session.results["Abbreviation"] == driver_code]["TeamName"].iloc[0]
@@ -480,32 +450,10 @@ with tabs[1]: #DRIVERS
         st.plotly_chart(fig3)
     with cols1[1]:
         st.subheader("Speed visualization on track map (fastest lap)")
-        colormap = cm.plasma
-        lap = session.laps.pick_driver(driver_code).pick_fastest()
-        # Get telemetry data
-        x = lap.telemetry['X']              # values for x-axis
-        y = lap.telemetry['Y']              # values for y-axis
-        color = lap.telemetry['Speed']      # value to base color gradient on
-        points = np.array([x, y]).T.reshape(-1, 1, 2)
-        segments = np.concatenate([points[:-1], points[1:]], axis=1)
-        # We create a plot with title and adjust some setting to make it look good.
-        fig, ax = plt.subplots(sharex=True, sharey=True, figsize=(12, 6.75))
-        fig.suptitle(f'{session.event["EventName"]} {session.event.year} {session_ftr} - {driver_code} - Speed', size=24, y=0.97)
-        # Adjust margins and turn of axis
-        plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.12)
-        ax.axis('off')
-        # After this, we plot the data itself.
-        # Create background track line
-        ax.plot(lap.telemetry['X'], lap.telemetry['Y'], color='black', linestyle='-', linewidth=16, zorder=0)
-        # Create a continuous norm to map from data points to colors
-        norm = plt.Normalize(color.min(), color.max())
-        lc = LineCollection(segments, cmap=colormap, norm=norm, linestyle='-', linewidth=5)
-        # Set the values used for colormapping
-        lc.set_array(color)
-        # Merge all line segments together
-        line = ax.add_collection(lc)
-        # Finally, we create a color bar as a legend.
-        cbaxes = fig.add_axes([0.25, 0.05, 0.5, 0.05])
-        normlegend = mpl.colors.Normalize(vmin=color.min(), vmax=color.max())
-        legend = mpl.colorbar.ColorbarBase(cbaxes, norm=normlegend, cmap=colormap, orientation="horizontal")
-        st.pyplot(ax.figure)
\ No newline at end of file
+        if telemetry_ftr:
+            st.image(
+                speed_map_image(session, store, season_ftr, race_option_ftr[race_ftr], session_ftr, driver_code),
+                use_column_width = True
+            )
+        else:
+            st.info(TELEMETRY_HINT)
\ No newline at end of file
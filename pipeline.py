@@ -0,0 +1,432 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import datetime as dt
+import pandas as pd
+from data_store import (
+    DATA_DIR,
+    STORE_DIR,
+    NULL_VALUE,
+    dataset_path,
+    read_dataset,
+    write_dataset)
+from lap_times import to_milliseconds
+from insight_cubes import CUBE_BUILDERS, RESULT_COLUMNS
+
+MANIFEST_PATH = os.path.join(STORE_DIR, "manifest.json")
+
+#LOOKUP TABLES (from preprocessing/circuits1.ipynb, constructors1.ipynb and drivers1.ipynb)
+CIRCUIT_ISO_ALPHA = {
+    'Australia': 'AUS',
+    'Malaysia': 'MYS',
+    'Bahrain': 'BHR',
+    'Spain': 'ESP',
+    'Turkey': 'TUR',
+    'Monaco': 'MCO',
+    'Canada': 'CAN',
+    'France': 'FRA',
+    'UK': 'GBR',
+    'Germany': 'DEU',
+    'Hungary': 'HUN',
+    'Belgium': 'BEL',
+    'Italy': 'ITA',
+    'Singapore': 'SGP',
+    'Japan': 'JPN',
+    'China': 'CHN',
+    'Brazil': 'BRA',
+    'USA': 'USA',
+    'UAE': 'ARE',
+    'Argentina': 'ARG',
+    'Portugal': 'PRT',
+    'South Africa': 'ZAF',
+    'Mexico': 'MEX',
+    'Korea': 'KOR',
+    'Netherlands': 'NLD',
+    'Sweden': 'SWE',
+    'Austria': 'AUT',
+    'Morocco': 'MAR',
+    'Switzerland': 'CHE',
+    'India': 'IND',
+    'Russia': 'RUS',
+    'Azerbaijan': 'AZE',
+    'Saudi Arabia': 'SAU',
+    'Qatar': 'QAT'
+}
+CIRCUIT_CONTINENT = {
+    'Australia': 'Oceania',
+    'Malaysia': 'Asia',
+    'Bahrain': 'Asia',
+    'Spain': 'Europe',
+    'Turkey': 'Europe',
+    'Monaco': 'Europe',
+    'Canada': 'North America',
+    'France': 'Europe',
+    'UK': 'Europe',
+    'Germany': 'Europe',
+    'Hungary': 'Europe',
+    'Belgium': 'Europe',
+    'Italy': 'Europe',
+    'Singapore': 'Asia',
+    'Japan': 'Asia',
+    'China': 'Asia',
+    'Brazil': 'South America',
+    'USA': 'North America',
+    'UAE': 'Asia',
+    'Argentina': 'South America',
+    'Portugal': 'Europe',
+    'South Africa': 'Africa',
+    'Mexico': 'North America',
+    'Korea': 'Asia',
+    'Netherlands': 'Europe',
+    'Sweden': 'Europe',
+    'Austria': 'Europe',
+    'Morocco': 'Africa',
+    'Switzerland': 'Europe',
+    'India': 'Asia',
+    'Russia': 'Europe',
+    'Azerbaijan': 'Asia',
+    'Saudi Arabia': 'Asia',
+    'Qatar': 'Asia'
+}
+COUNTRY_FLAG = {
+    'Australia': '🇦🇺',
+    'Malaysia': '🇲🇾',
+    'Bahrain': '🇧🇭',
+    'Spain': '🇪🇸',
+    'Turkey': '🇹🇷',
+    'Monaco': '🇲🇨',
+    'Canada': '🇨🇦',
+    'France': '🇫🇷',
+    'United Kingdom': '🇬🇧',
+    'Germany': '🇩🇪',
+    'Hungary': '🇭🇺',
+    'Belgium': '🇧🇪',
+    'Italy': '🇮🇹',
+    'Singapore': '🇸🇬',
+    'Japan': '🇯🇵',
+    'China': '🇨🇳',
+    'Brazil': '🇧🇷',
+    'United States': '🇺🇸',
+    'United Arab Emirates': '🇦🇪',
+    'Argentina': '🇦🇷',
+    'Portugal': '🇵🇹',
+    'South Africa': '🇿🇦',
+    'Mexico': '🇲🇽',
+    'South Korea': '🇰🇷',
+    'Netherlands': '🇳🇱',
+    'Sweden': '🇸🇪',
+    'Austria': '🇦🇹',
+    'Morocco': '🇲🇦',
+    'Switzerland': '🇨🇭',
+    'India': '🇮🇳',
+    'Russia': '🇷🇺',
+    'Azerbaijan': '🇦🇿',
+    'Saudi Arabia': '🇸🇦',
+    'Qatar': '🇶🇦'
+}
+#nationality: [country, flag, iso_alpha, continent]
+NATIONALITIES = {
+    'British': ['United Kingdom', '🇬🇧', 'GBR', 'Europe'],
+    'German': ['Germany', '🇩🇪', 'DEU', 'Europe'],
+    'Spanish': ['Spain', '🇪🇸', 'ESP', 'Europe'],
+    'Finnish': ['Finland', '🇫🇮', 'FIN', 'Europe'],
+    'Japanese': ['Japan', '🇯🇵', 'JPN', 'Asia'],
+    'French': ['France', '🇫🇷', 'FRA', 'Europe'],
+    'Polish': ['Poland', '🇵🇱', 'POL', 'Europe'],
+    'Brazilian': ['Brazil', '🇧🇷', 'BRA', 'South America'],
+    'Italian': ['Italy', '🇮🇹', 'ITA', 'Europe'],
+    'Australian': ['Australia', '🇦🇺', 'AUS', 'Oceania'],
+    'Austrian': ['Austria', '🇦🇹', 'AUT', 'Europe'],
+    'American': ['United States', '🇺🇸', 'USA', 'North America'],
+    'Dutch': ['Netherlands', '🇳🇱', 'NLD', 'Europe'],
+    'Colombian': ['Colombia', '🇨🇴', 'COL', 'South America'],
+    'Portuguese': ['Portugal', '🇵🇹', 'PRT', 'Europe'],
+    'Canadian': ['Canada', '🇨🇦', 'CAN', 'North America'],
+    'Indian': ['India', '🇮🇳', 'IND', 'Asia'],
+    'Hungarian': ['Hungary', '🇭🇺', 'HUN', 'Europe'],
+    'Irish': ['Ireland', '🇮🇪', 'IRL', 'Europe'],
+    'Danish': ['Denmark', '🇩🇰', 'DNK', 'Europe'],
+    'Argentine': ['Argentina', '🇦🇷', 'ARG', 'South America'],
+    'Czech': ['Czech Republic', '🇨🇿', 'CZE', 'Europe'],
+    'Malaysian': ['Malaysia', '🇲🇾', 'MYS', 'Asia'],
+    'Swiss': ['Switzerland', '🇨🇭', 'CHE', 'Europe'],
+    'Belgian': ['Belgium', '🇧🇪', 'BEL', 'Europe'],
+    'Monegasque': ['Monaco', '🇲🇨', 'MCO', 'Europe'],
+    'Swedish': ['Sweden', '🇸🇪', 'SWE', 'Europe'],
+    'Venezuelan': ['Venezuela', '🇻🇪', 'VEN', 'South America'],
+    'New Zealander': ['New Zealand', '🇳🇿', 'NZL', 'Oceania'],
+    'Chilean': ['Chile', '🇨🇱', 'CHL', 'South America'],
+    'Mexican': ['Mexico', '🇲🇽', 'MEX', 'North America'],
+    'South African': ['South Africa', '🇿🇦', 'ZAF', 'Africa'],
+    'Liechtensteiner': ['Liechtenstein', '🇱🇮', 'LIE', 'Europe'],
+    'Rhodesian': ['Zimbabwe', '🇿🇼', 'ZWE', 'Africa'],
+    'Thai': ['Thailand', '🇹🇭', 'THA', 'Asia'],
+    'Russian': ['Russia', '🇷🇺', 'RUS', 'Europe'],
+    'Indonesian': ['Indonesia', '🇮🇩', 'IDN', 'Asia'],
+    'Chinese': ['China', '🇨🇳', 'CHN', 'Asia']
+}
+#Constructors also use 'East German' and 'Hong Kong'
+CONSTRUCTOR_NATIONALITIES = {
+    **NATIONALITIES,
+    'East German': ['Germany', '🇩🇪', 'DEU', 'Europe'],
+    'Hong Kong': ['Hong Kong', '🇭🇰', 'HKG', 'Asia']
+}
+
+#READING THE ERGAST CSV DUMP
+def read_csv(name):
+    return pd.read_csv(
+        os.path.join(DATA_DIR, f"{name}.csv"),
+        na_values = NULL_VALUE,
+        keep_default_na = False)
+
+def _map_nationality(nationality, table, position):
+    return nationality.map({key: value[position] for key, value in table.items()})
+
+#STAGES
+def build_circuits(previous = None):
+    circuits = read_csv("circuits")
+    circuits["iso_alpha"] = circuits["country"].map(CIRCUIT_ISO_ALPHA)
+    circuits["continent"] = circuits["country"].map(CIRCUIT_CONTINENT)
+    circuits["country_flag"] = circuits["country"].map(COUNTRY_FLAG)
+    return circuits
+
+def build_constructors(previous = None):
+    constructors = read_csv("constructors")
+    nationality = constructors["nationality"]
+    constructors["country"] = _map_nationality(nationality, CONSTRUCTOR_NATIONALITIES, 0)
+    constructors["iso_alpha"] = _map_nationality(nationality, CONSTRUCTOR_NATIONALITIES, 2)
+    constructors["continent"] = _map_nationality(nationality, CONSTRUCTOR_NATIONALITIES, 3)
+    constructors["country_flag"] = _map_nationality(nationality, CONSTRUCTOR_NATIONALITIES, 1)
+    return constructors
+
+def build_drivers(previous = None):
+    drivers = read_csv("drivers")
+    drivers["name"] = drivers["forename"] + " " + drivers["surname"]
+    for position, column in enumerate(["country", "country_flag", "iso_alpha", "continent"]):
+        drivers[column] = _map_nationality(drivers["nationality"], NATIONALITIES, position)
+    #Age in whole years, without a per-row relativedelta
+    dob = pd.to_datetime(drivers["dob"])
+    today = dt.date.today()
+    before_birthday = (dob.dt.month > today.month) | (
+        (dob.dt.month == today.month) & (dob.dt.day > today.day))
+    drivers["age"] = today.year - dob.dt.year - before_birthday.astype(int)
+    return drivers
+
+def build_races_circuits(previous = None):
+    races_circuits = pd.merge(
+        read_csv("races"),
+        read_dataset("circuits"),
+        on = "circuitId",
+        how = "left"
+    )
+    return races_circuits.rename(columns = {
+        "name_x": "name_race",
+        "name_y": "name_circuit",
+        "url_x": "url_race",
+        "url_y": "url_circuit"
+    })
+
+def _join_results(results):
+    data = results.merge(read_csv("races"), on = "raceId", how = "left")
+    data = data.merge(read_csv("drivers"), on = "driverId", how = "left")
+    data = data.merge(read_csv("constructors"), on = "constructorId", how = "left")
+    data = data.merge(read_csv("status"), on = "statusId", how = "left")
+    data = data.rename(columns = {
+        "number_x": "number_driver",
+        "time_x": "total_race_time",
+        "name_x": "name_race",
+        "time_y": "race_time",
+        "url_x": "url_race",
+        "nationality_x": "driver_nationality",
+        "url_y": "url_driver",
+        "name_y": "constructor_name",
+        "nationality_y": "constructor_nationality",
+        "url": "url_constructor"
+    }).drop("number_y", axis = 1)
+    data = data.merge(read_csv("circuits"), on = "circuitId", how = "left")
+    data = data.rename(columns = {"name": "circuit_name"})
+    data["driver_name"] = data["forename"] + " " + data["surname"]
+    return data
+
+def build_results(previous = None):
+    results = read_csv("results")
+    if previous is not None:
+        #Only result rows that are not in the previous build
+        results = results[~results["resultId"].isin(previous["resultId"].unique())]
+        if results.empty:
+            return previous
+        return pd.concat([previous, _join_results(results)], ignore_index = True)
+    return _join_results(results)
+
+def build_qualifying(previous = None):
+    return read_csv("qualifying")
+
+def build_pit_stops(previous = None):
+    return read_csv("pit_stops")
+
+def build_data_prep1(previous = None):
+    results = read_dataset("results")
+    results["fastestLapTime_milliseconds"] = to_milliseconds(results["fastestLapTime"])
+    return results[[
+        "raceId",
+        "driverId",
+        "constructorId",
+        "number_driver",
+        "grid",
+        "position",
+        "laps",
+        "milliseconds",
+        "fastestLap",
+        "rank",
+        "fastestLapTime_milliseconds",
+        "fastestLapSpeed",
+        "statusId",
+        "year",
+        "round",
+        "circuitId"
+    ]]
+
+def _cube_stage(name):
+    def build_cube(previous = None):
+        return CUBE_BUILDERS[name](read_dataset("results", columns = RESULT_COLUMNS))
+    return build_cube
+
+#name: (builder, csv inputs, upstream stages, supports incremental builds)
+STAGES = {
+    "circuits": (build_circuits, ["circuits"], [], False),
+    "constructors": (build_constructors, ["constructors"], [], False),
+    "drivers": (build_drivers, ["drivers"], [], False),
+    "races_circuits": (build_races_circuits, ["races"], ["circuits"], False),
+    "results": (
+        build_results,
+        ["results", "races", "drivers", "constructors", "status", "circuits"],
+        [],
+        True),
+    "qualifying": (build_qualifying, ["qualifying"], [], False),
+    "pit_stops": (build_pit_stops, ["pit_stops"], [], False),
+    "data_prep1": (build_data_prep1, [], ["results"], False),
+    **{name: (_cube_stage(name), [], ["results"], False) for name in CUBE_BUILDERS}
+}
+#Inputs that usually only gain rows for new races between two Ergast dumps;
+#the incremental build checks that their earlier rows did not change
+APPEND_ONLY_INPUTS = {"results", "races"}
+
+def _csv_path(name):
+    return os.path.join(DATA_DIR, f"{name}.csv")
+
+def _file_hash(name, size = None):
+    #SHA-1 of a CSV file, or of its first size bytes
+    digest = hashlib.sha1()
+    remaining = os.path.getsize(_csv_path(name)) if size is None else size
+    with open(_csv_path(name), "rb") as file:
+        while remaining > 0:
+            chunk = file.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def _only_appended(csv, previous_state):
+    #The file still starts with every byte of the one the previous build read:
+    #rows were only added, no earlier row (a penalty, a DSQ) was corrected
+    size = previous_state.get("sizes", {}).get(csv)
+    return (
+        size is not None
+        and os.path.getsize(_csv_path(csv)) >= size
+        and _file_hash(csv, size) == previous_state["inputs"].get(csv))
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as file:
+        return json.load(file)
+
+def save_manifest(manifest):
+    os.makedirs(STORE_DIR, exist_ok = True)
+    with open(MANIFEST_PATH, "w") as file:
+        json.dump(manifest, file, indent = 2, sort_keys = True)
+
+def _with_dependencies(names):
+    ordered = []
+    def visit(name):
+        if name in ordered:
+            return
+        for upstream in STAGES[name][2]:
+            visit(upstream)
+        ordered.append(name)
+    for name in names:
+        visit(name)
+    return ordered
+
+def run(stages = None, full = False, force = False, dry_run = False):
+    manifest = load_manifest()
+    hashes = {}
+    rebuilt = set()
+    for name in _with_dependencies(stages or list(STAGES)):
+        builder, inputs, upstream, incremental = STAGES[name]
+        for csv in inputs:
+            if csv not in hashes:
+                hashes[csv] = _file_hash(csv)
+        state = {
+            "inputs": {csv: hashes[csv] for csv in inputs},
+            "upstream": {stage: manifest.get(stage, {}).get("version", 0) for stage in upstream}
+        }
+        previous_state = manifest.get(name)
+        built = previous_state is not None and os.path.exists(dataset_path(name))
+        if built and not force and not rebuilt.intersection(upstream) and all(
+            previous_state.get(key) == value for key, value in state.items()):
+            print(f"{name}: up to date")
+            continue
+        changed = [
+            csv for csv in inputs
+            if not built or previous_state["inputs"].get(csv) != hashes[csv]]
+        append_only = (
+            incremental
+            and built
+            and not full
+            and not force
+            and set(changed) <= APPEND_ONLY_INPUTS
+            and state["upstream"] == previous_state.get("upstream")
+            and all(_only_appended(csv, previous_state) for csv in changed))
+        mode = "incremental" if append_only else "full"
+        rebuilt.add(name)
+        if dry_run:
+            print(f"{name}: would rebuild ({mode}; changed inputs: {', '.join(changed) or 'upstream'})")
+            continue
+        start = time.perf_counter()
+        data = builder(read_dataset(name) if append_only else None)
+        write_dataset(name, data)
+        manifest[name] = {
+            **state,
+            "sizes": {csv: os.path.getsize(_csv_path(csv)) for csv in inputs},
+            "version": manifest.get(name, {}).get("version", 0) + 1,
+            "rows": int(len(data)),
+            "built_at": dt.datetime.now().isoformat(timespec = "seconds")
+        }
+        save_manifest(manifest)
+        print(f"{name}: rebuilt ({mode}) - {len(data)} rows in {time.perf_counter() - start:.2f}s")
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        description = "Rebuild the data/store datasets from the Ergast CSV files in data/")
+    parser.add_argument("stages", nargs = "*",
+                        help = f"stages to rebuild: {', '.join(STAGES)} (default: all); "
+                               "upstream stages are included")
+    parser.add_argument("--full", action = "store_true",
+                        help = "reprocess every season instead of appending new races")
+    parser.add_argument("--force", action = "store_true",
+                        help = "rebuild stages even when their inputs did not change")
+    parser.add_argument("--dry-run", action = "store_true",
+                        help = "only print which stages would be rebuilt")
+    args = parser.parse_args(argv)
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    run(args.stages, full = args.full, force = args.force, dry_run = args.dry_run)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
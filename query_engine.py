@@ -0,0 +1,254 @@
+import os
+import threading
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from data_store import DATA_DIR, NULL_VALUE, dataset_path
+from dataset_registry import registry, get_dataset
+from lap_times import parse_time_columns
+
+#Raw Ergast tables, loaded from the CSVs in data/ as ergast_<name>
+CSV_TABLES = ["results", "sprint_results", "races", "drivers", "constructors", "circuits", "status"]
+#Datasets enriched by pipeline.py (flags, ISO codes, continents), loaded under their own name
+STORE_TABLES = ["circuits", "constructors", "drivers", "races_circuits"]
+#Reloading any of these rebuilds the engine
+ENGINE_SOURCES = [*STORE_TABLES, *[os.path.join(DATA_DIR, f"{name}.csv") for name in CSV_TABLES]]
+
+#Time-string columns of the CSV tables that get an integer-milliseconds
+#companion (<column>_ms), parsed once by lap_times like the data store
+TIME_COLUMNS = {
+    "results": ["fastestLapTime"],
+    "sprint_results": ["fastestLapTime"]
+}
+#results1.ipynb joins, evaluated by the engine on demand
+VIEWS = [
+    """CREATE VIEW race_results AS SELECT
+        res.resultId,
+        res.raceId,
+        res.driverId,
+        res.constructorId,
+        res.position,
+        res.fastestLap,
+        res.fastestLapTime,
+        res.fastestLapTime_ms,
+        res.fastestLapSpeed,
+        ra.year,
+        ra.round,
+        ra.circuitId,
+        ra.name AS name_race,
+        CAST(ra.date AS VARCHAR) AS date,
+        d.forename || ' ' || d.surname AS driver_name,
+        d.nationality AS driver_nationality,
+        co.name AS constructor_name,
+        co.nationality AS constructor_nationality,
+        st.status,
+        ci.name AS circuit_name,
+        ci.country
+    FROM ergast_results res
+    LEFT JOIN ergast_races ra USING (raceId)
+    LEFT JOIN ergast_drivers d USING (driverId)
+    LEFT JOIN ergast_constructors co USING (constructorId)
+    LEFT JOIN ergast_status st USING (statusId)
+    LEFT JOIN ergast_circuits ci ON ci.circuitId = ra.circuitId"""
+]
+
+#Fastest laps listed per entity on the Insights page
+TOP_N = 100
+FASTEST_LAPS_QUERY = """
+    SELECT
+        year,
+        round,
+        name_race,
+        circuit_name,
+        date,
+        driver_name,
+        constructor_name,
+        position,
+        fastestLap,
+        fastestLapTime,
+        fastestLapSpeed
+    FROM race_results
+    WHERE {id_column} = $entity_id AND fastestLapTime_ms IS NOT NULL
+    ORDER BY fastestLapTime_ms, resultId
+    LIMIT $limit"""
+
+#Ergast API race/sprint results (fastf1.ergast column names) of a season,
+#or of one round when $round is not NULL
+ERGAST_RESULTS_QUERY = """
+    SELECT
+        ra.round,
+        res.number,
+        res.position,
+        res.positionText,
+        CAST(res.points AS DOUBLE) AS points,
+        res.grid,
+        res.laps,
+        st.status,
+        d.driverRef AS driverId,
+        d.number AS driverNumber,
+        d.code AS driverCode,
+        d.forename AS givenName,
+        d.surname AS familyName,
+        d.nationality AS driverNationality,
+        co.constructorRef AS constructorId,
+        co.name AS constructorName,
+        co.nationality AS constructorNationality,
+        res.milliseconds AS totalRaceTimeMillis
+    FROM ergast_{table} res
+    JOIN ergast_races ra USING (raceId)
+    LEFT JOIN ergast_drivers d USING (driverId)
+    LEFT JOIN ergast_constructors co USING (constructorId)
+    LEFT JOIN ergast_status st USING (statusId)
+    WHERE ra.year = $season AND ($round IS NULL OR ra.round = $round)
+    ORDER BY ra.round, res.positionOrder"""
+
+#Named, parameterized queries called by the pages
+QUERIES = {
+    **{
+        f"{entity}_fastest_laps": FASTEST_LAPS_QUERY.format(id_column = id_column)
+        for entity, id_column in [
+            ("circuit", "circuitId"),
+            ("constructor", "constructorId"),
+            ("driver", "driverId")]},
+    #Empty filter lists select every driver in table order
+    "drivers_table": """
+        SELECT
+            country AS "Country",
+            continent AS "Continent",
+            name AS "Name",
+            number AS "Number",
+            code AS "Code",
+            dob AS "Date of birth",
+            age AS "Age",
+            url AS "URL (about the driver)"
+        FROM drivers
+        WHERE (len($countries) = 0 AND len($continents) = 0)
+            OR list_contains($countries, country)
+            OR list_contains($continents, continent)
+        ORDER BY
+            CASE WHEN len($countries) = 0 AND len($continents) = 0 THEN rowid END,
+            "Country",
+            "Continent",
+            "Name" """,
+    "races_table": """
+        SELECT
+            name_race AS "Grand Prix",
+            year AS "Year",
+            date AS "Date",
+            name_circuit AS "Circuit",
+            location AS "Location",
+            country AS "Country",
+            continent AS "Continent",
+            url_race AS "About (Race)"
+        FROM races_circuits
+        WHERE (len($races) = 0 AND len($years) = 0 AND len($circuits) = 0
+                AND len($locations) = 0 AND len($countries) = 0 AND len($continents) = 0)
+            OR list_contains($races, name_race)
+            OR list_contains($years, year)
+            OR list_contains($circuits, name_circuit)
+            OR list_contains($locations, location)
+            OR list_contains($countries, country)
+            OR list_contains($continents, continent)
+        ORDER BY date DESC""",
+    "ergast_schedule": """
+        SELECT
+            ra.year AS season,
+            ra.round,
+            ra.url,
+            ra.name AS raceName,
+            CAST(ra.date AS TIMESTAMP) AS raceDate,
+            CAST(ra.time AS VARCHAR) AS raceTime,
+            ci.circuitRef AS circuitId,
+            ci.url AS circuitUrl,
+            ci.name AS circuitName,
+            ci.lat,
+            ci.lng AS long,
+            ci.location AS locality,
+            ci.country
+        FROM ergast_races ra
+        LEFT JOIN ergast_circuits ci USING (circuitId)
+        WHERE ra.year = $season
+        ORDER BY ra.round""",
+    "ergast_race_results": ERGAST_RESULTS_QUERY.format(table = "results"),
+    "ergast_sprint_results": ERGAST_RESULTS_QUERY.format(table = "sprint_results"),
+    "races_by_circuit": """
+        SELECT name_circuit, location, country, lat, lng, count(continent) AS count
+        FROM races_circuits
+        WHERE name_circuit IS NOT NULL AND location IS NOT NULL AND country IS NOT NULL
+            AND lat IS NOT NULL AND lng IS NOT NULL
+        GROUP BY ALL
+        ORDER BY name_circuit, location, country, lat, lng"""
+}
+
+#Integer columns with NULLs come back as nullable integers, like the data
+#store; the others (e.g. counts) stay plain numpy integers
+ARROW_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype()
+}
+
+def _parameter(value):
+    #DuckDB cannot bind numpy scalars (e.g. the int32 ids of the data store)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_parameter(item) for item in value]
+    return value
+
+class QueryEngine:
+    def __init__(self, data_dir = DATA_DIR):
+        self._connection = duckdb.connect()
+        self._local = threading.local()
+        for name in CSV_TABLES:
+            self._connection.execute(
+                f"CREATE TABLE ergast_{name} AS SELECT * FROM read_csv(?, header = true, nullstr = ?)",
+                [os.path.join(data_dir, f"{name}.csv"), NULL_VALUE])
+            if name in TIME_COLUMNS:
+                self._add_milliseconds(f"ergast_{name}", TIME_COLUMNS[name])
+        for name in STORE_TABLES:
+            if os.path.exists(dataset_path(name)):
+                self._connection.execute(
+                    f"CREATE TABLE {name} AS SELECT * FROM read_parquet(?)",
+                    [dataset_path(name)])
+            else:
+                self._connection.register(f"{name}_frame", get_dataset(name))
+                self._connection.execute(f"CREATE TABLE {name} AS SELECT * FROM {name}_frame")
+                self._connection.unregister(f"{name}_frame")
+        for statement in VIEWS:
+            self._connection.execute(statement)
+
+    def _add_milliseconds(self, table, columns):
+        #Appends the parsed columns row by row (DuckDB keeps insertion order)
+        times = self._connection.execute(f"SELECT {', '.join(columns)} FROM {table}").df()
+        times = parse_time_columns(times, columns)[[f"{column}_ms" for column in columns]]
+        self._connection.register("times_frame", times)
+        self._connection.execute(
+            f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM {table} POSITIONAL JOIN times_frame")
+        self._connection.unregister("times_frame")
+
+    def _cursor(self):
+        #DuckDB connections are not thread-safe: one cursor per thread
+        if not hasattr(self._local, "cursor"):
+            self._local.cursor = self._connection.cursor()
+        return self._local.cursor
+
+    def query(self, name, **params):
+        return self.sql(QUERIES[name], params)
+
+    def sql(self, text, params = None):
+        params = {name: _parameter(value) for name, value in (params or {}).items()}
+        result = self._cursor().execute(text, params).arrow()
+        frame = result.to_pandas()
+        for position, field in enumerate(result.schema):
+            if field.type in ARROW_TYPES and result.column(position).null_count:
+                frame[field.name] = result.column(position).to_pandas(types_mapper = ARROW_TYPES.get)
+        return frame
+
+def load_engine():
+    return registry.derived("query_engine", QueryEngine, depends_on = ENGINE_SOURCES)
+
+def run_query(name, **params):
+    return load_engine().query(name, **params)
@@ -0,0 +1,74 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ergast_fetch import ergast_fetcher
+from single_flight import SingleFlight
+
+#Seasons offered on the Seasons page, newest first
+SEASONS = [2023, 2022, 2021, 2020, 2019]
+
+logger = logging.getLogger(__name__)
+
+class SeasonPoints:
+    def __init__(self, matrix, order, missing = None):
+        #matrix: driverCode x race name points (race + sprint), rows in
+        #championship order; order: driver codes in that order; missing:
+        #{round: race} of the rounds that could not be fetched
+        self.matrix = matrix
+        self.order = order
+        self.missing = missing or {}
+
+def build_season_points(season, fetcher = ergast_fetcher):
+    results, missing = fetcher.season_results(season, fetcher.race_schedule(season))
+    races = dict(zip(results["round"], results["race"]))
+    matrix = results.pivot(index = "driverCode", columns = "round", values = "points")
+    # Rank the drivers by their total points
+    matrix = matrix.loc[matrix.sum(axis = 1).sort_values(ascending = False, kind = "stable").index]
+    # Use race name, instead of round no., as column names
+    matrix.columns = [races[round] for round in matrix.columns]
+    return SeasonPoints(matrix, list(matrix.index), missing)
+
+_points = {}
+_points_lock = threading.Lock()
+_builds = SingleFlight()
+_precompute = ThreadPoolExecutor(max_workers = 1)
+_precomputed = False
+
+def _build(season):
+    with _points_lock:
+        if season in _points:
+            return _points[season]
+    points = build_season_points(season)
+    if points.missing:
+        #Built again on the next call, once the failed rounds may be fetched
+        return points
+    with _points_lock:
+        return _points.setdefault(season, points)
+
+def season_points(season):
+    #Built once per season and process (seasons with missing rounds are
+    #rebuilt on later calls); a page asking for a season the background
+    #precompute is building waits for that build instead of fetching the same
+    #rounds again
+    with _points_lock:
+        if season in _points:
+            return _points[season]
+    return _builds.run(season, lambda: _build(season))
+
+def _warm(season):
+    try:
+        season_points(season)
+    except Exception as error:
+        #Shown (or retried) when the season is opened
+        logger.debug("Precomputing season %s failed: %r", season, error)
+
+def precompute_season_points(seasons = SEASONS):
+    #Builds every season in the background once per process; the seasons in
+    #the CSV dump need no network calls
+    global _precomputed
+    with _points_lock:
+        if _precomputed:
+            return
+        _precomputed = True
+    for season in seasons:
+        _precompute.submit(_warm, season)
@@ -0,0 +1,213 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import pandas as pd
+import fastf1
+from fastf1.core import Telemetry
+from single_flight import SingleFlight
+
+#Memory budget for parsed sessions, in MB
+SESSION_CACHE_MB = int(os.getenv("F1_SESSION_CACHE_MB", 2048))
+#Directory for telemetry spilled out of memory; unset to drop it instead
+TELEMETRY_SPILL_DIR = os.getenv("F1_TELEMETRY_SPILL_DIR")
+#Seconds a request waits for a load started by another request
+LOAD_TIMEOUT = float(os.getenv("F1_SESSION_LOAD_TIMEOUT", 300))
+
+#Session.load() flags needed by each data group a view can ask for
+DATA_GROUPS = {
+    "laps": {"laps": True},
+    "telemetry": {"laps": True, "telemetry": True},
+    "weather": {"weather": True},
+    "messages": {"messages": True}
+}
+FRAME_ATTRIBUTES = [
+    "_laps",
+    "_results",
+    "_session_status",
+    "_track_status",
+    "_weather_data",
+    "_race_control_messages"
+]
+TELEMETRY_ATTRIBUTES = ["_car_data", "_pos_data"]
+
+def _frame_size(frame):
+    return int(frame.memory_usage(index = True, deep = True).sum())
+
+def session_size(session):
+    #Bytes held by the loaded data of a session
+    size = 0
+    for attribute in FRAME_ATTRIBUTES:
+        frame = getattr(session, attribute, None)
+        if isinstance(frame, pd.DataFrame):
+            size += _frame_size(frame)
+    for attribute in TELEMETRY_ATTRIBUTES:
+        for frame in getattr(session, attribute, {}).values():
+            size += _frame_size(frame)
+    return size
+
+class CachedSession:
+    def __init__(self, session):
+        self.session = session
+        self.lock = threading.Lock()
+        self.groups = set()
+        self.size = 0
+        self.spill_path = None
+
+class SessionCache:
+    def __init__(
+        self,
+        budget_mb = SESSION_CACHE_MB,
+        spill_dir = TELEMETRY_SPILL_DIR,
+        timeout = LOAD_TIMEOUT):
+        self.budget = budget_mb * 2**20
+        self.spill_dir = spill_dir
+        self.timeout = timeout
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._flights = SingleFlight()
+
+    def load(self, season, race, event, groups = ("laps",), prefetch = False):
+        #Concurrent requests for the same session and groups share one load;
+        #the others wait up to self.timeout and get its result or its error.
+        #Prefetched sessions enter at the cold end of the LRU and are evicted
+        #first, so they never push out the sessions users are viewing
+        key = (season, race, event)
+        session = self._flights.run(
+            (key, tuple(sorted(groups))),
+            lambda: self._load(key, groups, prefetch),
+            timeout = self.timeout)
+        if not prefetch:
+            self._touch(key)
+        return session
+
+    def loaded(self, season, race, event, groups = ("laps",)):
+        with self._lock:
+            entry = self._entries.get((season, race, event))
+            return entry is not None and set(groups) <= entry.groups
+
+    def _load(self, key, groups, prefetch = False):
+        #Loads the missing data groups into the cached session in place. Laps
+        #are reloaded with every upgrade because Session.load() post-processes
+        #them together with the other groups
+        entry = self._entry(key, recent = not prefetch)
+        #Another group of the same session may be loading
+        if not entry.lock.acquire(timeout = self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for {key}")
+        try:
+            missing = set(groups) - entry.groups
+            if missing == {"telemetry"} and entry.spill_path is not None:
+                self._restore_telemetry(entry)
+            elif missing:
+                flags = dict.fromkeys(["laps", "telemetry", "weather", "messages"], False)
+                for group in entry.groups | missing:
+                    flags.update(DATA_GROUPS[group])
+                entry.session.load(**flags)
+                entry.groups.update(missing)
+                if flags["telemetry"]:
+                    self._drop_spill(entry)
+            entry.size = session_size(entry.session)
+        finally:
+            entry.lock.release()
+        self._evict(keep = None if prefetch else key)
+        return entry.session
+
+    def release_telemetry(self, season, race, event):
+        #Drops the telemetry of a cached session once it is served from elsewhere
+        with self._lock:
+            entry = self._entries.get((season, race, event))
+        if entry is None:
+            return
+        with entry.lock:
+            for attribute in TELEMETRY_ATTRIBUTES:
+                setattr(entry.session, attribute, {})
+            entry.groups.discard("telemetry")
+            self._drop_spill(entry)
+            entry.size = session_size(entry.session)
+
+    def usage(self):
+        #{(season, race, event): (bytes, loaded groups)}, least recently used first
+        with self._lock:
+            return {
+                key: (entry.size, sorted(entry.groups))
+                for key, entry in self._entries.items()}
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._drop_spill(entry)
+            self._entries.clear()
+
+    def _entry(self, key, recent = True):
+        with self._lock:
+            if key not in self._entries:
+                #Event metadata only: nothing is downloaded until a group is loaded
+                self._entries[key] = CachedSession(fastf1.get_session(*key))
+                self._entries.move_to_end(key, last = recent)
+            elif recent:
+                self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def _touch(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def _total(self):
+        return sum(entry.size for entry in self._entries.values())
+
+    def _evict(self, keep):
+        with self._lock:
+            candidates = [key for key in self._entries if key != keep]
+            #Spilling telemetry keeps laps and results of the session in memory
+            if self.spill_dir is not None:
+                for key in candidates:
+                    if self._total() <= self.budget:
+                        return
+                    entry = self._entries[key]
+                    if "telemetry" in entry.groups and entry.lock.acquire(blocking = False):
+                        try:
+                            self._spill_telemetry(key, entry)
+                        finally:
+                            entry.lock.release()
+            for key in candidates:
+                if self._total() <= self.budget:
+                    return
+                self._drop_spill(self._entries.pop(key))
+
+    def _spill_telemetry(self, key, entry):
+        path = os.path.join(self.spill_dir, "_".join(str(part) for part in key).replace(" ", "_"))
+        os.makedirs(path, exist_ok = True)
+        for attribute in TELEMETRY_ATTRIBUTES:
+            channels = getattr(entry.session, attribute, {})
+            if channels:
+                frame = pd.concat(
+                    {driver: pd.DataFrame(telemetry) for driver, telemetry in channels.items()},
+                    names = ["Driver"]).reset_index(level = 0)
+                frame.reset_index(drop = True).to_parquet(os.path.join(path, f"{attribute[1:]}.parquet"))
+            setattr(entry.session, attribute, {})
+        entry.groups.discard("telemetry")
+        entry.spill_path = path
+        entry.size = session_size(entry.session)
+
+    def _restore_telemetry(self, entry):
+        for attribute in TELEMETRY_ATTRIBUTES:
+            file = os.path.join(entry.spill_path, f"{attribute[1:]}.parquet")
+            channels = {}
+            if os.path.exists(file):
+                for driver, frame in pd.read_parquet(file).groupby("Driver", sort = False):
+                    channels[driver] = Telemetry(
+                        frame.drop(columns = "Driver").reset_index(drop = True),
+                        session = entry.session,
+                        driver = driver)
+            setattr(entry.session, attribute, channels)
+        entry.groups.add("telemetry")
+        self._drop_spill(entry)
+
+    def _drop_spill(self, entry):
+        if entry.spill_path is not None:
+            shutil.rmtree(entry.spill_path, ignore_errors = True)
+            entry.spill_path = None
+
+#One cache per process, shared by every user session
+session_cache = SessionCache()
@@ -0,0 +1,127 @@
+import streamlit as st
+import plotly.graph_objects as go
+import fastf1.plotting
+
+#Charts built per process; one entry per (season, round, session)
+SESSION_CHART_ENTRIES = 64
+#Swarm marker colours of the lap time distributions
+COMPOUND_MARKER_COLORS = {
+    "SOFT": "red",
+    "MEDIUM": "yellow",
+    "HARD": "blue"
+}
+
+def position_chart(laps, drivers):
+    #One pivot of LapNumber x DriverNumber instead of a pick_driver() per driver
+    positions = laps.pivot(index = "LapNumber", columns = "DriverNumber", values = "Position")
+    names = laps.drop_duplicates(subset = "DriverNumber").set_index("DriverNumber")["Driver"]
+    fig = go.Figure()
+    for number in drivers:
+        if number in positions.columns:
+            fig.add_trace(
+                go.Scatter(
+                    x = positions.index,
+                    y = positions[number],
+                    mode = "markers+lines",
+                    name = names[number],
+                    marker = {"size": 8}
+                )
+            )
+    fig.update_layout(
+        xaxis_title = "Lap Number",
+        yaxis_title = "Position",
+        yaxis_tickmode = "linear"
+    )
+    fig.update_yaxes(autorange = "reversed")
+    return fig
+
+def tyre_strategy_chart(laps, drivers, title):
+    #Stints from one groupby; each compound is a single bar trace whose bars
+    #start where the driver's previous stint ended
+    stints = laps[["Driver", "Stint", "Compound", "LapNumber"]]
+    stints = stints[stints["Driver"].isin(drivers)]
+    stints = stints.groupby(["Driver", "Stint", "Compound"]).count().reset_index()
+    stints = stints.rename(columns = {"LapNumber": "StintLength"})
+    stints["StintStart"] = stints.groupby("Driver")["StintLength"].cumsum() - stints["StintLength"]
+    fig = go.Figure()
+    for compound, compound_stints in stints.groupby("Compound", sort = False):
+        fig.add_trace(
+            go.Bar(
+                y = compound_stints["Driver"],
+                x = compound_stints["StintLength"],
+                name = compound,
+                orientation = 'h',
+                marker_color = fastf1.plotting.COMPOUND_COLORS.get(compound, "grey"),
+                base = compound_stints["StintStart"]
+            )
+        )
+    fig.update_layout(
+        barmode = 'stack',
+        title = title,
+        xaxis_title = "Lap Number",
+        yaxis = {'categoryorder':'total ascending'},  # Sort drivers
+        legend_title = "Tyre Compound",
+        yaxis_tickmode = "linear"
+    )
+    return fig
+
+def lap_time_distribution_chart(laps, finishing_order, title):
+    #laps: quick laps of the drivers in finishing_order
+    laps = laps.reset_index(drop = True)
+    lap_times = laps["LapTime"].dt.total_seconds()
+    fig = go.Figure()
+    # Add a violin for each driver, from one groupby
+    groups = lap_times.groupby(laps["Driver"], sort = False)
+    for driver in finishing_order:
+        if driver in groups.groups:
+            driver_lap_times = groups.get_group(driver)
+            fig.add_trace(
+                go.Violin(
+                    x = laps.loc[driver_lap_times.index, "Driver"],
+                    y = driver_lap_times,
+                    name = driver,
+                ))
+    # Add swarmplot (scatter plot)
+    fig.add_trace(
+        go.Scatter(
+            x = laps["Driver"],
+            y = lap_times,
+            mode = 'markers',
+            marker = dict(
+                color = laps["Compound"].map(COMPOUND_MARKER_COLORS),
+                symbol = 'circle',
+                size = 5),
+        ))
+    fig.update_layout(
+        title = title,
+        xaxis_title = "Driver",
+        yaxis_title = "Lap Time (s)",
+        yaxis = dict(
+            categoryorder = 'array',
+            categoryarray = finishing_order),
+        showlegend = False
+    )
+    return fig
+
+def _abbreviations(session, drivers):
+    return [session.get_driver(driver)["Abbreviation"] for driver in drivers]
+
+@st.cache_data(max_entries = SESSION_CHART_ENTRIES, show_spinner = False)
+def position_figure(_session, season, race, event):
+    return position_chart(_session.laps, _session.drivers)
+
+@st.cache_data(max_entries = SESSION_CHART_ENTRIES, show_spinner = False)
+def tyre_strategy_figure(_session, season, race, event):
+    return tyre_strategy_chart(
+        _session.laps,
+        _abbreviations(_session, _session.drivers),
+        f"{_session.event['EventName']} {_session.event.year} {event} - Tyre Strategies")
+
+@st.cache_data(max_entries = SESSION_CHART_ENTRIES, show_spinner = False)
+def lap_time_distribution_figure(_session, season, race, event):
+    # Laps of the point finishers only, without slow laps
+    point_finishers = _session.drivers[:10]
+    return lap_time_distribution_chart(
+        _session.laps.pick_drivers(point_finishers).pick_quicklaps(),
+        _abbreviations(_session, point_finishers),
+        f"{_session.event['EventName']} {_session.event.year} {event} - Lap Time Distributions")
@@ -0,0 +1,106 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastf1.req import RateLimitExceededError
+from ergast_fetch import TokenBucket
+from session_cache import session_cache
+
+#Concurrent background loads; 0 turns prefetching off
+PREFETCH_WORKERS = int(os.getenv("F1_PREFETCH_WORKERS", 2))
+#Sessions warmed around the selected round, in this order
+PREFETCH_SESSIONS = ["Race", "Qualifying"]
+#Rounds before and after the selected one that are warmed
+PREFETCH_ROUNDS = int(os.getenv("F1_PREFETCH_ROUNDS", 2))
+#Ergast calls per hour prefetching may use, out of FastF1's hard limit of
+#200 calls/h per process; the rest is left to interactive loads
+PREFETCH_ERGAST_CALLS = int(os.getenv("F1_PREFETCH_ERGAST_CALLS", 40))
+#Ergast calls made by loading one Race or Qualifying session
+ERGAST_CALLS_PER_LOAD = 2
+
+logger = logging.getLogger(__name__)
+
+def nearby_rounds(rounds, first_round, radius):
+    #Rounds within radius of first_round (the season's first round if None),
+    #closest first
+    rounds = sorted(rounds)
+    if not rounds:
+        return []
+    at = rounds.index(first_round) if first_round in rounds else 0
+    nearby = rounds[max(at - radius, 0):at + radius + 1]
+    return sorted(nearby, key = lambda round: abs(round - rounds[at]))
+
+class SeasonPrefetcher:
+    def __init__(
+        self,
+        workers = PREFETCH_WORKERS,
+        cache = session_cache,
+        sessions = PREFETCH_SESSIONS,
+        radius = PREFETCH_ROUNDS,
+        ergast_calls = PREFETCH_ERGAST_CALLS):
+        self.cache = cache
+        self.sessions = sessions
+        self.radius = radius
+        self._executor = ThreadPoolExecutor(max_workers = workers) if workers > 0 else None
+        self._budget = TokenBucket(ergast_calls / 3600, ergast_calls)
+        self._lock = threading.Lock()
+        #season: (cancel event, {(round, event): future})
+        self._queues = {}
+
+    def prefetch(self, season, rounds, first_round = None, groups = ("laps",)):
+        #Warms the FastF1 disk cache (and, when there is room, the session
+        #cache) for the sessions next to first_round. Each season has its own
+        #queue, so users on different seasons do not cancel each other
+        if self._executor is None:
+            return
+        with self._lock:
+            cancelled, futures = self._queues.setdefault(season, (threading.Event(), {}))
+            for round in nearby_rounds(rounds, first_round, self.radius):
+                for event in self.sessions:
+                    future = futures.get((round, event))
+                    #Loads skipped for lack of Ergast budget are queued again
+                    if future is None or (future.done() and future.result() is False):
+                        futures[(round, event)] = self._executor.submit(
+                            self._load, cancelled, season, round, event, groups)
+
+    def cancel(self, season = None):
+        #Queued loads are dropped; a load already running finishes
+        with self._lock:
+            seasons = list(self._queues) if season is None else [season]
+            for season in seasons:
+                if season in self._queues:
+                    cancelled, futures = self._queues.pop(season)
+                    cancelled.set()
+                    for future in futures.values():
+                        future.cancel()
+
+    def pending(self, season = None):
+        with self._lock:
+            return sum(
+                not future.done()
+                for queued, (_, futures) in self._queues.items()
+                if season is None or queued == season
+                for future in futures.values())
+
+    def _load(self, cancelled, season, round, event, groups):
+        #False when the load was skipped and may be queued again
+        if cancelled.is_set() or self.cache.loaded(season, round, event, groups):
+            return True
+        if not self._budget.try_acquire(ERGAST_CALLS_PER_LOAD):
+            logger.debug("Prefetch of %s %s %s skipped: Ergast budget used", season, round, event)
+            return False
+        try:
+            self.cache.load(season, round, event, groups, prefetch = True)
+        except RateLimitExceededError:
+            logger.debug("Prefetch of %s %s %s skipped: Ergast rate limit", season, round, event)
+            return False
+        except Exception as error:
+            #Sessions that cannot be loaded (e.g. not held yet) end up here
+            logger.debug("Prefetch of %s %s %s failed: %r", season, round, event, error)
+        return True
+
+#One worker pool per process, shared by every user session
+season_prefetcher = SeasonPrefetcher()
+
+def prefetch_season(season, rounds, first_round = None):
+    season_prefetcher.prefetch(season, rounds, first_round)
@@ -0,0 +1,41 @@
+import threading
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    #Concurrent calls with the same key share one execution: the first caller
+    #runs the function, the others wait for its result or its exception
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def run(self, key, function, timeout = None):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+        if leader:
+            try:
+                flight.result = function()
+            except BaseException as error:
+                flight.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.result
+        if not flight.done.wait(timeout):
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {key}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+from dataset_registry import registry
+from query_engine import ENGINE_SOURCES, load_engine
+
+#Race and sprint results with their season and round, from the CSV dump
+RESULTS_QUERY = """
+    SELECT ra.year, ra.round, res.raceId, res.driverId, res.constructorId, res.position,
+        CAST(res.points AS DOUBLE) AS points, false AS sprint, res.rank
+    FROM ergast_results res
+    JOIN ergast_races ra USING (raceId)
+    UNION ALL
+    SELECT ra.year, ra.round, res.raceId, res.driverId, res.constructorId, res.position,
+        CAST(res.points AS DOUBLE) AS points, true AS sprint, NULL AS rank
+    FROM ergast_sprint_results res
+    JOIN ergast_races ra USING (raceId)"""
+ENTITIES = {
+    "driver": "driverId",
+    "constructor": "constructorId"
+}
+
+class PointsSystem:
+    def __init__(self, race = None, sprint = None, best_results = None, fastest_lap = 0, fastest_lap_top = None):
+        #race / sprint: points of positions 1, 2, ...; None keeps the points
+        #of results.csv / sprint_results.csv. best_results: only a driver's
+        #best N rounds of a season count; ((6, 5), (5, 4)) counts the best 5 of
+        #the first 6 rounds and the best 4 of the rest; a dict gives the rule
+        #of each season. fastest_lap: extra points for the fastest lap of a
+        #race scored with a race scale (Ergast ranks laps from 2004 on), only
+        #for finishers in the top fastest_lap_top when set
+        self.race = race
+        self.sprint = sprint
+        self.best_results = best_results
+        self.fastest_lap = fastest_lap
+        self.fastest_lap_top = fastest_lap_top
+
+#Drivers' championship drop rules: best N results, or the best of each half
+#of the season from 1967 to 1980. Every result counts from 1991 on
+DROP_RULES = {
+    **dict.fromkeys(range(1950, 1954), 4),
+    **dict.fromkeys(range(1954, 1958), 5),
+    1958: 6,
+    1959: 5,
+    1960: 6,
+    1961: 5,
+    1962: 5,
+    **dict.fromkeys(range(1963, 1966), 6),
+    1966: 5,
+    1967: ((6, 5), (5, 4)),
+    1968: ((6, 5), (6, 5)),
+    1969: ((6, 5), (5, 4)),
+    1970: ((7, 6), (6, 5)),
+    1971: ((6, 5), (5, 4)),
+    1972: ((6, 5), (6, 5)),
+    1973: ((8, 7), (7, 6)),
+    1974: ((8, 7), (7, 6)),
+    1975: ((7, 6), (7, 6)),
+    1976: ((8, 7), (8, 7)),
+    1977: ((9, 8), (8, 7)),
+    1978: ((8, 7), (8, 7)),
+    1979: ((7, 4), (8, 4)),
+    1980: ((7, 5), (7, 5)),
+    **dict.fromkeys(range(1981, 1991), 11)
+}
+
+#"Official" is the points of the dump with each season's drop rules; the
+#historic race scales are plain scales, with every result counting
+POINTS_SYSTEMS = {
+    "Official": PointsSystem(best_results = DROP_RULES),
+    "Official, every result counts": PointsSystem(),
+    "1950-1959 scale": PointsSystem([8, 6, 4, 3, 2], fastest_lap = 1),
+    "1960 scale": PointsSystem([8, 6, 4, 3, 2, 1]),
+    "1961-1990 scale": PointsSystem([9, 6, 4, 3, 2, 1]),
+    "1991-2002 scale": PointsSystem([10, 6, 4, 3, 2, 1]),
+    "2003-2009 scale": PointsSystem([10, 8, 6, 5, 4, 3, 2, 1]),
+    "2010-2018 scale": PointsSystem([25, 18, 15, 12, 10, 8, 6, 4, 2, 1]),
+    "2019-2023 scale": PointsSystem([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], sprint = [8, 7, 6, 5, 4, 3, 2, 1], fastest_lap = 1, fastest_lap_top = 10)
+}
+
+class StandingsEngine:
+    #Championship progression of every season in the dump. Each entity
+    #(driver or constructor) of a season is a row of a season x round matrix,
+    #so scoring, drop-worst rules and cumulative sums run for all seasons at
+    #once. Everything that does not depend on the points system (cells,
+    #countback order) is computed here, once
+    def __init__(self, results):
+        results = results.astype({column: np.int64 for column in ["year", "round", "raceId", *ENTITIES.values()]})
+        self.results = results.sort_values(by = ["year", "round"], kind = "stable").reset_index(drop = True)
+        rounds = self.results[["year", "round", "raceId"]].drop_duplicates(subset = "raceId")
+        rounds["slot"] = rounds.groupby("year").cumcount()
+        self.rounds = rounds.reset_index(drop = True)
+        self._slot = self.results["raceId"].map(rounds.set_index("raceId")["slot"]).to_numpy()
+        self._slots = int(rounds["slot"].max()) + 1
+        season_rounds = rounds.groupby("year").size()
+        position = self.results["position"].to_numpy(dtype = np.float64, na_value = np.nan)
+        self._position = np.nan_to_num(position, nan = 0).astype(int)
+        self._sprint = self.results["sprint"].to_numpy(dtype = bool)
+        self._fastest = self.results["rank"].to_numpy(dtype = np.float64, na_value = np.nan) == 1
+        round_of = rounds.set_index(["year", "slot"])
+        self._entities = {}
+        for entity, column in ENTITIES.items():
+            pairs = self.results[["year", column]].drop_duplicates().reset_index(drop = True)
+            row = pd.MultiIndex.from_frame(pairs).get_indexer(pd.MultiIndex.from_frame(self.results[["year", column]]))
+            #From the entity's first round of the season to the season's last
+            first = np.full(len(pairs), self._slots)
+            np.minimum.at(first, row, self._slot)
+            slots = np.arange(self._slots)[None, :]
+            last = pairs["year"].map(season_rounds).to_numpy()[:, None] - 1
+            cells = np.nonzero((slots >= first[:, None]) & (slots <= last))
+            pair, slot = cells
+            year = pairs["year"].to_numpy()[pair]
+            #Countback: ties on points are broken by the number of wins, then
+            #of second places and so on, as in the official standings
+            classified = ~self._sprint & (self._position > 0)
+            places = np.zeros((len(pairs), self._slots, self._position.max()), dtype = np.int32)
+            np.add.at(places, (row[classified], self._slot[classified], self._position[classified] - 1), 1)
+            places = np.cumsum(places, axis = 1)[cells]
+            countback = np.empty(len(pair), dtype = np.int64)
+            countback[np.lexsort((*(-places[:, ::-1].T), slot, year))] = np.arange(len(pair))
+            index = pd.MultiIndex.from_arrays([year, slot])
+            self._entities[entity] = {
+                "pairs": len(pairs),
+                "years": pairs["year"].to_numpy(),
+                "row": row,
+                "cells": cells,
+                "final": slot == last[pair, 0],
+                "frame": pd.DataFrame({
+                    "year": year,
+                    "round": round_of["round"].reindex(index).to_numpy(),
+                    "raceId": round_of["raceId"].reindex(index).to_numpy(),
+                    column: pairs[column].to_numpy()[pair],
+                    "wins": places[:, 0]}),
+                "countback": countback}
+
+    def _result_points(self, system):
+        points = self.results["points"].to_numpy(dtype = np.float64, na_value = 0)
+        for scale, rows in ((system.race, ~self._sprint), (system.sprint, self._sprint)):
+            if scale is not None:
+                table = np.zeros(max(self._position.max(), len(scale)) + 1)
+                table[1:len(scale) + 1] = scale
+                points = np.where(rows, table[self._position], points)
+        if system.race is not None and system.fastest_lap:
+            fastest = self._fastest
+            if system.fastest_lap_top is not None:
+                fastest = fastest & (self._position > 0) & (self._position <= system.fastest_lap_top)
+            points = points + np.where(fastest, system.fastest_lap, 0)
+        return points
+
+    def _drop_rules(self, years, best_results):
+        #Per entity row: rounds in the first part of the season and the
+        #number of results counted in each part
+        rules = {}
+        for year in np.unique(years):
+            rule = best_results.get(year) if isinstance(best_results, dict) else best_results
+            if rule is None:
+                rules[year] = (self._slots, self._slots, 0)
+            elif isinstance(rule, tuple):
+                (split, first), (_, second) = rule
+                rules[year] = (split, first, second)
+            else:
+                rules[year] = (self._slots, rule, 0)
+        return np.array([rules[year] for year in years]).T
+
+    def standings(self, system = POINTS_SYSTEMS["Official"], entity = "driver", final = False):
+        #year, round, raceId, <entity>Id, points, wins and position after every
+        #round of every season (only after the last round if final)
+        data = self._entities[entity]
+        round_points = np.zeros((data["pairs"], self._slots))
+        np.add.at(round_points, (data["row"], self._slot), self._result_points(system))
+        if system.best_results is None or entity != "driver":
+            points = np.cumsum(round_points, axis = 1)
+        else:
+            #Best N of the rounds so far, for every round and each part of
+            #the season: rounds after the current one or in the other part
+            #score 0, so the top N of each prefix is a sort away
+            split, first, second = self._drop_rules(data["years"], system.best_results)
+            slots = np.arange(self._slots)
+            prefix = np.tril(np.ones((self._slots, self._slots), dtype = bool))
+            later = slots[None, :] >= split[:, None]
+            points = 0
+            for part, best in ((~later, first), (later, second)):
+                counted = np.where(prefix[None, :, :] & part[:, None, :], round_points[:, None, :], 0)
+                ranked = np.sort(counted, axis = 2)[:, :, ::-1]
+                points = points + np.where(slots < best[:, None, None], ranked, 0).sum(axis = 2)
+        keep = data["final"] if final else slice(None)
+        standings = data["frame"][keep].reset_index(drop = True)
+        standings.insert(4, "points", points[data["cells"]][keep])
+        #Rank within each round: points first, countback on ties
+        order = np.lexsort((data["countback"][keep], -standings["points"].to_numpy(), standings["round"].to_numpy(), standings["year"].to_numpy()))
+        group = standings["raceId"].to_numpy()[order]
+        first = np.r_[True, group[1:] != group[:-1]]
+        start = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+        position = np.empty(len(order), dtype = int)
+        position[order] = np.arange(len(order)) - start + 1
+        standings["position"] = position
+        return standings.iloc[order].reset_index(drop = True)
+
+    def final_standings(self, system = POINTS_SYSTEMS["Official"], entity = "driver"):
+        return self.standings(system, entity, final = True)
+
+    def rescore(self, systems = POINTS_SYSTEMS, entity = "driver"):
+        #Final standings of every season under each system, one frame with a
+        #system column, e.g. for "what if" champions
+        return pd.concat(
+            {name: self.final_standings(system, entity) for name, system in systems.items()},
+            names = ["system"]).reset_index(level = 0).reset_index(drop = True)
+
+def load_standings_engine():
+    return registry.derived(
+        "standings_engine",
+        lambda: StandingsEngine(load_engine().sql(RESULTS_QUERY)),
+        depends_on = ENGINE_SOURCES)
@@ -0,0 +1,74 @@
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGES = [
+    "app.py",
+    "pages/overview.py",
+    "pages/insights.py",
+    "pages/seasons.py",
+    "pages/ai_space.py",
+    "pages/about.py"
+]
+#Runs in a fresh interpreter: times each import in the order the page makes them
+TIMER = """
+import json, sys, time
+timings = []
+for module in sys.argv[1:]:
+    start = time.perf_counter()
+    __import__(module)
+    timings.append([module, time.perf_counter() - start])
+print(json.dumps(timings))
+"""
+
+def page_imports(path):
+    with open(os.path.join(ROOT, path)) as file:
+        tree = ast.parse(file.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+def time_imports(modules):
+    #Cold start: nothing is cached from the previous page
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER, *modules],
+        cwd = ROOT,
+        capture_output = True,
+        text = True,
+        check = True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def report(pages, top = 5):
+    for page in pages:
+        timings = time_imports(page_imports(page))
+        total = sum(seconds for _, seconds in timings)
+        print(f"{page}: {total:.2f}s")
+        for module, seconds in sorted(timings, key = lambda timing: -timing[1])[:top]:
+            print(f"    {module:<40} {seconds:.3f}s")
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        description = "Time the module-level imports of each page in a fresh interpreter")
+    parser.add_argument("pages", nargs = "*",
+                        help = f"pages to time: {', '.join(PAGES)} (default: all)")
+    parser.add_argument("--top", type = int, default = 5,
+                        help = "slowest imports listed per page")
+    args = parser.parse_args(argv)
+    unknown = [page for page in args.pages if not os.path.exists(os.path.join(ROOT, page))]
+    if unknown:
+        parser.error(f"unknown page(s): {', '.join(unknown)}")
+    report(args.pages or PAGES, top = args.top)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,185 @@
+import os
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from fastf1.mvapi import get_circuit_info
+from session_cache import session_cache
+from single_flight import SingleFlight
+
+#Per-session telemetry stores, next to the FastF1 cache
+TELEMETRY_DIR = os.getenv("F1_TELEMETRY_DIR", "./cache_fastf1/telemetry")
+#Merged car + position channels written for every lap
+CHANNELS = [
+    "Time",
+    "Distance",
+    "Speed",
+    "RPM",
+    "nGear",
+    "Throttle",
+    "Brake",
+    "DRS",
+    "X",
+    "Y",
+    "Z"
+]
+#Session time keeps float64 precision, every other channel is float32
+TIME_CHANNEL = "SessionTime"
+
+def store_path(season, race, event):
+    return os.path.join(TELEMETRY_DIR, f"{season}_{race}_{event}".replace(" ", "_"))
+
+def _driver_laps(merged, laps):
+    #Sample positions of every lap of one driver, in lap order
+    time = merged[TIME_CHANNEL].dt.total_seconds().to_numpy()
+    lap_start = laps["LapStartTime"].dt.total_seconds().to_numpy()
+    lap_end = laps["Time"].dt.total_seconds().to_numpy()
+    starts = np.searchsorted(time, lap_start, side = "left")
+    lengths = np.searchsorted(time, lap_end, side = "right") - starts
+    offsets = np.cumsum(lengths) - lengths
+    rows = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+    return rows, lengths, offsets, np.repeat(lap_start, lengths)
+
+def _lap_distance(session_time, lap_time, speed, is_car, lengths):
+    #Telemetry.add_distance() integrates the car samples of a lap; the merged
+    #position samples get the distance interpolated between them
+    lap = np.repeat(np.arange(len(lengths)), lengths)
+    car = np.flatnonzero(is_car)
+    if len(car) == 0:
+        return np.zeros(len(lap_time))
+    car_lap = lap[car]
+    first = np.r_[True, car_lap[1:] != car_lap[:-1]]
+    dt = np.diff(lap_time[car], prepend = 0.0)
+    dt[first] = lap_time[car][first]
+    step = speed[car] / 3.6 * dt
+    total = np.cumsum(step)
+    base = np.zeros(len(lengths))
+    base[car_lap[first]] = (total - step)[first]
+    return np.interp(session_time, session_time[car], total) - base[lap]
+
+def build_telemetry_store(session, path):
+    #One merge per driver over the whole session, then every lap is a slice
+    #of it, instead of merging car and position data again for each lap
+    laps = session.laps.dropna(subset = ["LapStartTime", "Time"])
+    columns = {channel: [] for channel in [TIME_CHANNEL, *CHANNELS]}
+    index = []
+    position = 0
+    for number in session.drivers:
+        if number not in session.car_data or number not in session.pos_data:
+            continue
+        driver_laps = laps[laps["DriverNumber"] == number].sort_values(by = "LapStartTime")
+        if driver_laps.empty:
+            continue
+        merged = session.pos_data[number].merge_channels(session.car_data[number])
+        rows, lengths, offsets, lap_start = _driver_laps(merged, driver_laps)
+        session_time = merged[TIME_CHANNEL].dt.total_seconds().to_numpy()[rows]
+        lap_time = session_time - lap_start
+        speed = merged["Speed"].to_numpy(dtype = np.float64)[rows]
+        columns[TIME_CHANNEL].append(session_time)
+        columns["Time"].append(lap_time.astype(np.float32))
+        is_car = merged["Source"].to_numpy()[rows] == "car"
+        distance = _lap_distance(session_time, lap_time, speed, is_car, lengths)
+        columns["Distance"].append(distance.astype(np.float32))
+        for channel in CHANNELS[2:]:
+            columns[channel].append(merged[channel].to_numpy(dtype = np.float32)[rows])
+        index.append(pd.DataFrame({
+            "Driver": driver_laps["Driver"].to_numpy(),
+            "DriverNumber": number,
+            "LapNumber": driver_laps["LapNumber"].astype(int).to_numpy(),
+            "start": position + offsets,
+            "stop": position + offsets + lengths}))
+        position += len(rows)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(temporary, exist_ok = True)
+    for channel, arrays in columns.items():
+        dtype = np.float64 if channel == TIME_CHANNEL else np.float32
+        np.save(os.path.join(temporary, f"{channel}.npy"), np.concatenate(arrays) if arrays else np.empty(0, dtype))
+    index = pd.concat(index, ignore_index = True) if index else pd.DataFrame(
+        columns = ["Driver", "DriverNumber", "LapNumber", "start", "stop"])
+    index.to_parquet(os.path.join(temporary, "index.parquet"))
+    try:
+        os.replace(temporary, path)
+    except OSError:
+        #Built concurrently by another process
+        shutil.rmtree(temporary, ignore_errors = True)
+    return path
+
+class TelemetryStore:
+    def __init__(self, path):
+        self.path = path
+        self.index = pd.read_parquet(os.path.join(path, "index.parquet"))
+        self._rows = {
+            (driver, lap): (start, stop)
+            for driver, lap, start, stop in self.index[["Driver", "LapNumber", "start", "stop"]].itertuples(index = False)}
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, name):
+        #Whole-session column, memory-mapped on first use
+        with self._lock:
+            if name not in self._channels:
+                self._channels[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode = "r")
+            return self._channels[name]
+
+    def has_lap(self, driver, lap_number):
+        return (driver, int(lap_number)) in self._rows
+
+    def lap(self, driver, lap_number, channels = None):
+        #{channel: array} views of one lap; only the pages touched are read
+        start, stop = self._rows[(driver, int(lap_number))]
+        return {name: self.channel(name)[start:stop] for name in channels or CHANNELS}
+
+    def laps(self, keys, channels = None):
+        #lap() of several (driver, lap number) keys with a single gather per
+        #channel; laps missing from the store are left out
+        keys = [(driver, int(lap_number)) for driver, lap_number in keys if self.has_lap(driver, lap_number)]
+        ranges = np.array([self._rows[key] for key in keys], dtype = np.int64).reshape(-1, 2)
+        lengths = ranges[:, 1] - ranges[:, 0]
+        offsets = np.cumsum(lengths) - lengths
+        rows = np.arange(lengths.sum()) - np.repeat(offsets - ranges[:, 0], lengths)
+        bounds = np.cumsum(lengths)[:-1]
+        columns = {name: np.split(self.channel(name)[rows], bounds) for name in channels or CHANNELS}
+        return {
+            key: {name: parts[position] for name, parts in columns.items()}
+            for position, key in enumerate(keys)}
+
+_stores = {}
+_stores_lock = threading.Lock()
+_builds = SingleFlight()
+
+def open_telemetry_store(season, race, event):
+    path = store_path(season, race, event)
+    with _stores_lock:
+        if path not in _stores and os.path.exists(path):
+            _stores[path] = TelemetryStore(path)
+        return _stores.get(path)
+
+def _build(season, race, event):
+    session = session_cache.load(season, race, event, ["laps", "telemetry"])
+    build_telemetry_store(session, store_path(season, race, event))
+    #The store now serves every telemetry view
+    session_cache.release_telemetry(season, race, event)
+
+def load_telemetry_store(season, race, event):
+    #Builds the store from the session on first use
+    store = open_telemetry_store(season, race, event)
+    if store is None:
+        os.makedirs(TELEMETRY_DIR, exist_ok = True)
+        _builds.run((season, race, event), lambda: _build(season, race, event))
+        store = open_telemetry_store(season, race, event)
+    return store
+
+def store_circuit_info(session, store):
+    #Session.get_circuit_info() without the session telemetry: corner
+    #distances come from the fastest lap in the store
+    info = get_circuit_info(
+        year = session.event.year,
+        circuit_key = session.session_info["Meeting"]["Circuit"]["Key"])
+    fastest = session.laps.pick_fastest()
+    lap = store.lap(fastest["Driver"], fastest["LapNumber"], ["X", "Y", "Distance"])
+    track = np.column_stack([lap["X"], lap["Y"]])
+    for markers in (info.corners, info.marshal_sectors, info.marshal_lights):
+        points = markers[["X", "Y"]].to_numpy()
+        error = ((track[None, :, :] - points[:, None, :]) ** 2).sum(axis = 2)
+        markers["Distance"] = lap["Distance"][np.nanargmin(error, axis = 1)] if len(points) else []
+    return info
@@ -0,0 +1,163 @@
+import os
+import json
+import threading
+import numpy as np
+from single_flight import SingleFlight
+from telemetry_store import load_telemetry_store
+
+#Metres between two points of the distance grid
+DISTANCE_STEP = float(os.getenv("F1_DISTANCE_STEP", 10))
+#Channels of the tensor, in order of its last axis (Time: lap time in s)
+TENSOR_CHANNELS = [
+    "Time",
+    "Speed",
+    "Throttle",
+    "Brake",
+    "nGear",
+    "RPM"
+]
+#Step channels take the last sample instead of a linear interpolation
+STEP_CHANNELS = ["Brake", "nGear"]
+TENSOR_FILE = "distance_tensor.npy"
+TENSOR_META = "distance_tensor.json"
+
+class LapAxis:
+    #Laps laid end to end on one distance axis (lap k starts at k * span), so
+    #resampling every lap onto a distance grid is a single np.interp (or
+    #np.searchsorted) call instead of one per lap. Shared by the tensor, the
+    #delta-time and the mini-sector engines
+    def __init__(self, distance, lengths):
+        #distance: Distance samples of every lap, concatenated in lap order;
+        #lengths: number of samples of each lap
+        lengths = np.asarray(lengths, dtype = np.int64)
+        ends = np.cumsum(lengths)
+        self.valid = lengths > 0
+        self.first = np.zeros(len(lengths))
+        self.last = np.zeros(len(lengths))
+        self.first[self.valid] = distance[(ends - lengths)[self.valid]]
+        self.last[self.valid] = distance[ends[self.valid] - 1]
+        span = self.last.max(initial = 0) - min(self.first.min(initial = 0), 0) + 1
+        self.offset = np.arange(len(lengths)) * span
+        self.axis = np.asarray(distance, dtype = np.float64) + np.repeat(self.offset, lengths)
+
+    @classmethod
+    def from_laps(cls, laps):
+        #laps: [{"Distance": array, ...}], e.g. the values of TelemetryStore.laps()
+        distance = [lap["Distance"] for lap in laps]
+        return cls(np.concatenate(distance) if distance else np.empty(0), [len(lap) for lap in distance])
+
+    def points(self, grid):
+        #grid: distances shared by every lap, or one row per lap; clamped into
+        #the distance each lap covers
+        grid = np.broadcast_to(grid, (len(self.offset), np.shape(grid)[-1]))
+        return self.offset[:, None] + np.clip(grid, self.first[:, None], self.last[:, None])
+
+    def interpolate(self, values, grid):
+        #laps x grid array of the (concatenated) values, linearly interpolated;
+        #NaN for laps without samples
+        if len(self.axis) == 0:
+            return np.full((len(self.offset), np.shape(grid)[-1]), np.nan)
+        return np.where(self.valid[:, None], np.interp(self.points(grid), self.axis, values), np.nan)
+
+    def previous(self, values, grid):
+        #interpolate() for step channels: the last sample at or before each point
+        if len(self.axis) == 0:
+            return np.full((len(self.offset), np.shape(grid)[-1]), np.nan)
+        position = np.searchsorted(self.axis, self.points(grid), side = "right") - 1
+        return np.where(self.valid[:, None], values[np.clip(position, 0, len(self.axis) - 1)], np.nan)
+
+def build_distance_tensor(store, step = DISTANCE_STEP):
+    #Resamples every lap in the store onto one distance grid, one LapAxis
+    #call per channel for the whole session
+    index = store.index
+    drivers = list(dict.fromkeys(index["Driver"]))
+    max_lap = int(index["LapNumber"].max()) if len(index) else 0
+    starts = index["start"].to_numpy(dtype = np.int64)
+    lengths = np.maximum(index["stop"].to_numpy(dtype = np.int64) - starts, 0)
+    #Store rows of every lap, in lap order
+    rows = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+    laps = LapAxis(store.channel("Distance")[rows], lengths)
+    grid = np.arange(0, laps.last.max(initial = 0) + step, step)
+    covered = laps.valid[:, None] & (grid[None, :] <= laps.last[:, None])
+    path = os.path.join(store.path, TENSOR_FILE)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tensor = np.lib.format.open_memmap(
+        temporary,
+        mode = "w+",
+        dtype = np.float32,
+        shape = (len(drivers), max_lap, len(grid), len(TENSOR_CHANNELS)))
+    tensor[:] = np.nan
+    driver_position = {driver: position for position, driver in enumerate(drivers)}
+    driver_axis = index["Driver"].map(driver_position).to_numpy()
+    lap_axis = index["LapNumber"].to_numpy(dtype = np.int64) - 1
+    for position, channel in enumerate(TENSOR_CHANNELS):
+        values = store.channel(channel)[rows].astype(np.float32)
+        if len(values) == 0:
+            continue
+        resample = laps.previous if channel in STEP_CHANNELS else laps.interpolate
+        resampled = resample(values, grid)
+        tensor[driver_axis, lap_axis, :, position] = np.where(covered, resampled, np.nan)
+    tensor.flush()
+    del tensor
+    os.replace(temporary, path)
+    with open(os.path.join(store.path, TENSOR_META), "w") as file:
+        json.dump({"drivers": drivers, "channels": TENSOR_CHANNELS, "step": step, "points": len(grid)}, file)
+    return path
+
+class DistanceTensor:
+    #driver x lap x distance x channel float32 array, memory-mapped; the lap
+    #axis is indexed by lap number - 1 and missing laps are NaN
+    def __init__(self, path):
+        with open(os.path.join(path, TENSOR_META)) as file:
+            meta = json.load(file)
+        self.drivers = meta["drivers"]
+        self.distance = np.arange(meta["points"]) * meta["step"]
+        self.data = np.load(os.path.join(path, TENSOR_FILE), mmap_mode = "r")
+        self._drivers = {driver: position for position, driver in enumerate(self.drivers)}
+
+    def channel(self, name):
+        #driver x lap x distance view of one channel
+        return self.data[..., TENSOR_CHANNELS.index(name)]
+
+    def has_lap(self, driver, lap_number):
+        lap_number = int(lap_number)
+        return (
+            driver in self._drivers
+            and 0 < lap_number <= self.data.shape[1]
+            #Missing laps are NaN from the first grid point on
+            and not np.isnan(self.data[self._drivers[driver], lap_number - 1, 0, 0]))
+
+    def lap(self, driver, lap_number, channel = None):
+        lap = self.data[self._drivers[driver], int(lap_number) - 1]
+        return lap if channel is None else lap[:, TENSOR_CHANNELS.index(channel)]
+
+    def laps(self, drivers, lap_numbers, channel = None):
+        #Rows of several (driver, lap number) pairs at once
+        positions = [self._drivers[driver] for driver in drivers]
+        laps = self.data[positions, np.asarray(lap_numbers, dtype = int) - 1]
+        return laps if channel is None else laps[..., TENSOR_CHANNELS.index(channel)]
+
+def _is_current(path):
+    #Tensors written with other channels (an older version) are built again
+    try:
+        with open(os.path.join(path, TENSOR_META)) as file:
+            return json.load(file).get("channels") == TENSOR_CHANNELS
+    except OSError:
+        return False
+
+_tensors = {}
+_tensors_lock = threading.Lock()
+_builds = SingleFlight()
+
+def load_distance_tensor(season, race, event):
+    #Built from the session's telemetry store on first use
+    store = load_telemetry_store(season, race, event)
+    with _tensors_lock:
+        if store.path in _tensors:
+            return _tensors[store.path]
+    if not _is_current(store.path):
+        _builds.run(store.path, lambda: build_distance_tensor(store))
+    with _tensors_lock:
+        if store.path not in _tensors:
+            _tensors[store.path] = DistanceTensor(store.path)
+        return _tensors[store.path]
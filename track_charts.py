@@ -0,0 +1,100 @@
+import io
+import numpy as np
+import streamlit as st
+import matplotlib as mpl
+from matplotlib import cm
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from downsampling import downsample
+from track_geometry import load_track_geometry
+
+#Rendered track charts kept per process; one entry per (session, driver, chart)
+CHART_CACHE_ENTRIES = 128
+
+def _png(fig):
+    #Same output as st.pyplot(), rendered once instead of on every rerun.
+    #Figure() is used instead of pyplot, which keeps global state and is not
+    #safe across the threads of concurrent reruns
+    image = io.BytesIO()
+    fig.savefig(image, bbox_inches = "tight", dpi = 200, format = "png")
+    return image.getvalue()
+
+@st.cache_data(max_entries = CHART_CACHE_ENTRIES, show_spinner = False)
+def track_map_image(_session, _store, season, race, event):
+    geometry = load_track_geometry(_session, _store)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.plot(geometry.track[:, 0], geometry.track[:, 1], 'r')  # Plotting the track map
+    # Annotate each corner
+    ax.plot(
+        np.vstack([geometry.corners[:, 0], geometry.texts[:, 0]]),
+        np.vstack([geometry.corners[:, 1], geometry.texts[:, 1]]),
+        color='grey')
+    ax.scatter(geometry.texts[:, 0], geometry.texts[:, 1], color='grey', s=140)
+    for txt, (text_x, text_y) in zip(geometry.labels, geometry.texts):
+        ax.text(text_x, text_y, txt, va='center', ha='center', size='small', color='white')
+    # Customize the plot
+    ax.set_title(f"{_session.event['Location']} - {_session.event['Country']} ({_session.total_laps} laps)")
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_aspect('equal')
+    return _png(fig)
+
+@st.cache_data(max_entries = CHART_CACHE_ENTRIES, show_spinner = False)
+def gear_map_image(_session, _store, season, race, event):
+    lap = _session.laps.pick_fastest()
+    tel = downsample(_store.lap(lap["Driver"], lap["LapNumber"], ["X", "Y", "nGear"]), ["X", "Y", "nGear"])
+    points = np.column_stack([tel['X'], tel['Y']]).reshape(-1, 1, 2)
+    segments = np.concatenate([points[:-1], points[1:]], axis=1)
+    gear = tel['nGear'].astype(float)
+    fig = Figure()
+    ax = fig.subplots()
+    cmap = cm.get_cmap('Paired')
+    lc_comp = LineCollection(segments, norm=mpl.colors.Normalize(1, cmap.N+1), cmap=cmap)
+    lc_comp.set_array(gear)
+    lc_comp.set_linewidth(4)
+    ax.add_collection(lc_comp)
+    ax.axis('equal')
+    ax.tick_params(labelleft=False, left=False, labelbottom=False, bottom=False)
+    fig.suptitle(
+        f"Fastest Lap Gear Shift Visualization\n"
+        f"{lap['Driver']} - {_session.event['EventName']} {_session.event.year} {event}"
+    )
+    cbar = fig.colorbar(mappable=lc_comp, ax=ax, label="Gear", boundaries=np.arange(1, 10))
+    cbar.set_ticks(np.arange(1.5, 9.5))
+    cbar.set_ticklabels(np.arange(1, 9))
+    return _png(fig)
+
+@st.cache_data(max_entries = CHART_CACHE_ENTRIES, show_spinner = False)
+def speed_map_image(_session, _store, season, race, event, driver):
+    colormap = cm.plasma
+    lap = _session.laps.pick_driver(driver).pick_fastest()
+    # Get telemetry data
+    telemetry = downsample(_store.lap(driver, lap["LapNumber"], ["X", "Y", "Speed"]), ["X", "Y", "Speed"])
+    x = telemetry['X']              # values for x-axis
+    y = telemetry['Y']              # values for y-axis
+    color = telemetry['Speed']      # value to base color gradient on
+    points = np.array([x, y]).T.reshape(-1, 1, 2)
+    segments = np.concatenate([points[:-1], points[1:]], axis=1)
+    # We create a plot with title and adjust some setting to make it look good.
+    fig = Figure(figsize=(12, 6.75))
+    ax = fig.subplots(sharex=True, sharey=True)
+    fig.suptitle(f'{_session.event["EventName"]} {_session.event.year} {event} - {driver} - Speed', size=24, y=0.97)
+    # Adjust margins and turn of axis
+    fig.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.12)
+    ax.axis('off')
+    # After this, we plot the data itself.
+    # Create background track line
+    ax.plot(x, y, color='black', linestyle='-', linewidth=16, zorder=0)
+    # Create a continuous norm to map from data points to colors
+    norm = mpl.colors.Normalize(color.min(), color.max())
+    lc = LineCollection(segments, cmap=colormap, norm=norm, linestyle='-', linewidth=5)
+    # Set the values used for colormapping
+    lc.set_array(color)
+    # Merge all line segments together
+    ax.add_collection(lc)
+    # Finally, we create a color bar as a legend.
+    cbaxes = fig.add_axes([0.25, 0.05, 0.5, 0.05])
+    normlegend = mpl.colors.Normalize(vmin=color.min(), vmax=color.max())
+    mpl.colorbar.ColorbarBase(cbaxes, norm=normlegend, cmap=colormap, orientation="horizontal")
+    return _png(fig)
@@ -0,0 +1,92 @@
+import io
+import os
+import threading
+import numpy as np
+from downsampling import minmax_indices
+from telemetry_store import store_circuit_info
+
+#Track maps shared by every session at a circuit, next to the FastF1 cache
+TRACK_MAP_DIR = os.getenv("F1_TRACK_MAP_DIR", "./cache_fastf1/track_maps")
+#Points kept of the track outline
+TRACK_POINTS = 600
+#Distance of a corner label from the track, in track units (1/10 m)
+CORNER_OFFSET = 500
+
+def rotate(xy, angle):
+    #Rotates (n, 2) points by angle radians, as FastF1's track map example does
+    rotation = np.array([[np.cos(angle), np.sin(angle)],
+                         [-np.sin(angle), np.cos(angle)]])
+    return np.matmul(xy, rotation)
+
+class TrackGeometry:
+    def __init__(self, rotation, track, labels, corners, texts):
+        #rotation in radians; track, corners and texts are rotated (n, 2) points
+        self.rotation = rotation
+        self.track = track
+        self.labels = labels
+        self.corners = corners
+        self.texts = texts
+
+    def save(self, path):
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            rotation = self.rotation,
+            track = self.track,
+            labels = self.labels,
+            corners = self.corners,
+            texts = self.texts)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(buffer.getvalue())
+        os.replace(temporary, path)
+
+    @classmethod
+    def read(cls, path):
+        with np.load(path) as data:
+            return cls(float(data["rotation"]), data["track"], data["labels"], data["corners"], data["texts"])
+
+def geometry_key(session):
+    #Layouts change between seasons, so a circuit has one entry per year
+    return session.session_info["Meeting"]["Circuit"]["Key"], session.event.year
+
+def build_track_geometry(session, store):
+    #Outline of the session's fastest lap and the corner label positions,
+    #all rotated to the circuit's map orientation
+    circuit_info = store_circuit_info(session, store)
+    fastest = session.laps.pick_fastest()
+    lap = store.lap(fastest["Driver"], fastest["LapNumber"], ["X", "Y"])
+    track = np.column_stack([lap["X"], lap["Y"]]).astype(np.float64)
+    track = track[minmax_indices(track, TRACK_POINTS)]
+    rotation = circuit_info.rotation / 180 * np.pi
+    corners = circuit_info.corners
+    points = corners[["X", "Y"]].to_numpy(dtype = np.float64)
+    angles = corners["Angle"].to_numpy(dtype = np.float64) / 180 * np.pi
+    #The label offset vector (CORNER_OFFSET, 0) turned by each corner's angle
+    offsets = CORNER_OFFSET * np.column_stack([np.cos(angles), np.sin(angles)])
+    labels = (corners["Number"].astype(str) + corners["Letter"].fillna("").astype(str)).to_numpy(dtype = str)
+    return TrackGeometry(
+        rotation,
+        rotate(track, rotation),
+        labels,
+        rotate(points, rotation),
+        rotate(points + offsets, rotation))
+
+_geometries = {}
+_geometries_lock = threading.Lock()
+
+def load_track_geometry(session, store):
+    #Memory, then disk, then built from the session's telemetry store
+    circuit, year = geometry_key(session)
+    path = os.path.join(TRACK_MAP_DIR, f"{circuit}_{year}.npz")
+    with _geometries_lock:
+        if path in _geometries:
+            return _geometries[path]
+    if os.path.exists(path):
+        geometry = TrackGeometry.read(path)
+    else:
+        geometry = build_track_geometry(session, store)
+        os.makedirs(TRACK_MAP_DIR, exist_ok = True)
+        geometry.save(path)
+    with _geometries_lock:
+        return _geometries.setdefault(path, geometry)